@@ -3,6 +3,7 @@ ChatEngine - Orchestration layer for VibeChat.
 Integrates PDF ingestion, LLM providers, and conversation memory.
 """
 
+import os
 import re
 import logging
 import difflib
@@ -10,12 +11,28 @@ from typing import List, Dict, Optional
 from .ingest import parse_pdf, PDFContext
 from .models import get_provider, BaseLLMProvider, SYSTEM_PROMPT_TEMPLATE
 from .memory import ChatMemory
+from .persistence import ResponseCache
 from .mcp_host import get_mcp_host, MCPHost
 from ..settings import get_settings
 from ..config import get_active_model_id
 
 logger = logging.getLogger(__name__)
 
+# Durable LLM response cache shared by all engines (~/.vibecode/responses.db)
+_response_store: Optional[ResponseCache] = None
+
+
+def _get_response_store() -> Optional[ResponseCache]:
+    """Open the shared response cache database on first use."""
+    global _response_store
+    if _response_store is None:
+        try:
+            db_path = os.path.join(os.path.expanduser("~"), ".vibecode", "responses.db")
+            _response_store = ResponseCache(db_path)
+        except Exception as e:
+            logger.debug(f"Response cache unavailable: {e}")
+    return _response_store
+
 
 # --- PERSONA SYSTEM ---
 # The specific personas that VibeChat can adopt
@@ -121,6 +138,7 @@ class ChatEngine:
             # Only re-init if changed
             if name != self._current_provider_name or self.provider is None:
                 self.provider = get_provider(name, key, base_url=base_url)
+                self.provider.response_store = _get_response_store()
                 self._current_provider_name = name
                 logger.info(f"Initialized provider: {name}")
                 
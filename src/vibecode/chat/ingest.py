@@ -5,16 +5,23 @@ Prioritizes Digital Twin Manifest for 100% fidelity.
 """
 
 import re
-import json
-import zlib
-import base64
 import logging
 from typing import Dict, Optional
 from dataclasses import dataclass
 from pypdf import PdfReader
 
+from ..manifest import decode_payload, decompress_manifest, find_restore_block, parse_manifest
+
 logger = logging.getLogger(__name__)
 
+# Section patterns, compiled once at import
+_TREE_RE = re.compile(
+    r"CONTEXT: PROJECT STRUCTURE\s*\n.*?Below is the file tree.*?\n\n(.*?)(?=\n\n---|\Z)",
+    re.DOTALL
+)
+# File path and content between START_FILE/END_FILE markers
+_FILE_BLOCK_RE = re.compile(r"--- START_FILE:\s*(.+?)\s*---\s*\n(.*?)\n--- END_FILE ---", re.DOTALL)
+
 
 @dataclass
 class PDFContext:
@@ -113,16 +120,12 @@ def _extract_manifest(text: str) -> Optional[Dict[str, str]]:
     """
     import hashlib
     
-    # Pattern matches the manifest block from llm.py
-    manifest_pattern = r"--- VIBECODE_RESTORE_BLOCK_START ---\s*(.*?)\s*--- VIBECODE_RESTORE_BLOCK_END ---"
-    match = re.search(manifest_pattern, text, re.DOTALL)
-    
-    if not match:
+    # Locate the manifest block from llm.py
+    raw_payload = find_restore_block(text)
+    if raw_payload is None:
         return None
     
     try:
-        raw_payload = match.group(1).strip()
-        
         # Handle checksum format (Extension 1): sha256:<hash>\n<payload>
         if raw_payload.startswith("sha256:"):
             try:
@@ -148,13 +151,13 @@ def _extract_manifest(text: str) -> Optional[Dict[str, str]]:
             payload = raw_payload
         
         # Decode base64
-        compressed_data = base64.b64decode(payload)
+        compressed_data = decode_payload(payload)
         
-        # Decompress zlib
-        json_bytes = zlib.decompress(compressed_data)
+        # Decompress (zstd or zlib)
+        json_bytes = decompress_manifest(compressed_data)
         
         # Parse JSON
-        files = json.loads(json_bytes.decode('utf-8'))
+        files = parse_manifest(json_bytes)
         
         return files
         
@@ -166,8 +169,7 @@ def _extract_manifest(text: str) -> Optional[Dict[str, str]]:
 def _extract_tree(text: str) -> Optional[str]:
     """Extract the project tree from CONTEXT: PROJECT STRUCTURE section."""
     # Look for the tree section
-    tree_pattern = r"CONTEXT: PROJECT STRUCTURE\s*\n.*?Below is the file tree.*?\n\n(.*?)(?=\n\n---|\Z)"
-    match = re.search(tree_pattern, text, re.DOTALL)
+    match = _TREE_RE.search(text)
     
     if match:
         tree = match.group(1).strip()
@@ -187,10 +189,7 @@ def _extract_files(text: str) -> Dict[str, str]:
     """
     files = {}
     
-    # Regex to capture file path and content
-    pattern = r"--- START_FILE:\s*(.+?)\s*---\s*\n(.*?)\n--- END_FILE ---"
-    
-    matches = re.finditer(pattern, text, re.DOTALL)
+    matches = _FILE_BLOCK_RE.finditer(text)
     
     for match in matches:
         file_path = match.group(1).strip()
@@ -83,14 +83,13 @@ class KnowledgeBase:
         ids_to_upsert = []
         docs_to_upsert = []
         metadatas = []
-        updated_count = 0
+        changed_files = []
         
         for fpath, content in files.items():
             # Optimization: Only process if content changed
             if self.sql_db.needs_update(fpath, content):
                 logger.debug(f"Indexing: {fpath}")
-                self.sql_db.upsert_file(fpath, content)
-                updated_count += 1
+                changed_files.append((fpath, content))
                 
                 # Prepare for Vector DB (if enabled)
                 if self._vector_enabled:
@@ -100,6 +99,10 @@ class KnowledgeBase:
                     docs_to_upsert.append(truncated)
                     metadatas.append({"source": fpath, "chars": len(content)})
         
+        # Batch insert to SQL (one transaction for the whole sync)
+        self.sql_db.upsert_files(changed_files)
+        updated_count = len(changed_files)
+        
         # Batch insert to Chroma
         if self._vector_enabled and ids_to_upsert:
             try:
@@ -9,11 +9,12 @@ ECR #009: MCP Integration - Universal AI Socket Architecture
 
 import os
 import re
+import copy
 import json
 import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from contextlib import AsyncExitStack
 
 try:
@@ -26,6 +27,11 @@ except ImportError:
     StdioServerParameters = None
     stdio_client = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -34,6 +40,106 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+# Matches ${VAR_NAME} references in configuration values
+_ENV_VAR_PATTERN = re.compile(r'\$\{([^}]+)\}')
+
+
+def _compile_expander(value: Any) -> Callable[[Dict[str, str]], Any]:
+    """
+    Partially evaluate a config tree into a specialized ${VAR} expander.
+    
+    The tree is walked once to record which leaves contain ${VAR}
+    references; the returned function copies the literal tree and fills in
+    only those leaves, skipping per-node type dispatch on every call.
+    
+    Args:
+        value: Loaded JSON value (dict, list or scalar)
+        
+    Returns:
+        Function taking an environment mapping and returning the expanded value
+    """
+    substitutions = []  # (path, [literal, var, literal, var, ..., literal])
+    
+    def walk(node: Any, path: tuple) -> None:
+        if isinstance(node, str):
+            if '${' in node:
+                parts = _ENV_VAR_PATTERN.split(node)
+                if len(parts) > 1:
+                    substitutions.append((path, parts))
+        elif isinstance(node, dict):
+            for k, v in node.items():
+                walk(v, path + (k,))
+        elif isinstance(node, list):
+            for i, item in enumerate(node):
+                walk(item, path + (i,))
+    
+    walk(value, ())
+    literal = copy.deepcopy(value)
+    
+    if not substitutions:
+        return lambda env: copy.deepcopy(literal)
+    
+    def expand(env: Dict[str, str]) -> Any:
+        out = copy.deepcopy(literal)
+        for path, parts in substitutions:
+            # Odd indices of the split are variable names
+            text = "".join(
+                env.get(part, "") if i % 2 else part
+                for i, part in enumerate(parts)
+            )
+            if not path:
+                return text
+            target = out
+            for key in path[:-1]:
+                target = target[key]
+            target[path[-1]] = text
+        return out
+    
+    return expand
+
+
+def _text_of_str(block: str) -> Optional[str]:
+    return block
+
+
+def _text_of_attr(block: Any) -> Optional[str]:
+    return getattr(block, 'text', None)
+
+
+def _text_of_dict(block: dict) -> Optional[str]:
+    return block.get('text')
+
+
+def _text_of_other(block: Any) -> Optional[str]:
+    return None
+
+
+# Text extractor per content-block type, resolved on first sight of each type
+_TEXT_EXTRACTORS: Dict[type, Callable[[Any], Optional[str]]] = {}
+
+
+def _resolve_text_extractor(block: Any) -> Callable[[Any], Optional[str]]:
+    """Pick and cache the text extractor for a content block's type."""
+    if isinstance(block, str):
+        extractor = _text_of_str
+    elif hasattr(block, 'text'):
+        extractor = _text_of_attr
+    elif isinstance(block, dict):
+        extractor = _text_of_dict
+    else:
+        extractor = _text_of_other
+    _TEXT_EXTRACTORS[type(block)] = extractor
+    return extractor
+
+
+def _block_text(block: Any) -> Optional[str]:
+    """Extract text from a single content block, or None if it has none."""
+    extractor = _TEXT_EXTRACTORS.get(type(block))
+    if extractor is None:
+        extractor = _resolve_text_extractor(block)
+    return extractor(block)
+
+
 class MCPHostError(Exception):
     """Raised when MCP host operations fail."""
     pass
@@ -67,6 +173,12 @@ class MCPHost:
     # Default config location
     DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "config" / "mcp_servers.json"
     
+    # Seconds to wait for a single server to close before giving up on it
+    SHUTDOWN_TIMEOUT = 5.0
+    
+    # Default cap on in-flight tool calls per server (override with "max_concurrency")
+    DEFAULT_MAX_CONCURRENCY = 4
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize the MCPHost.
@@ -78,38 +190,46 @@ class MCPHost:
             logger.warning("MCP SDK not installed. Install with: pip install mcp")
             
         self.config_path = Path(config_path) if config_path else self.DEFAULT_CONFIG_PATH
-        self.exit_stack = AsyncExitStack()
+        self._server_stacks: Dict[str, AsyncExitStack] = {}
         self.sessions: Dict[str, ClientSession] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Compiled env expanders per server; valid for the config stamped below
+        self._env_expanders: Dict[str, Callable[[Dict[str, str]], Any]] = {}
+        self._config_stamp: Optional[Tuple[int, int]] = None
+        self._config: Optional[dict] = None
         self.available_tools: List[Dict[str, Any]] = []
         self._started = False
+        
+        # KnowledgeBase is resolved lazily on first auto-ingest, then reused
+        self._kb = None
+        self._kb_probed = False
     
-    def _expand_env_vars(self, value: Any) -> Any:
+    def _load_config(self) -> dict:
         """
-        Expand ${VAR_NAME} patterns in configuration values.
+        Read and parse mcp_servers.json in a single pass.
+        
+        The file is read as raw bytes and handed straight to orjson when it
+        is installed, skipping the text decode and the slower stdlib parser.
+        The parse (and the env expanders compiled from it) is kept until the
+        file's mtime or size changes, so a restart reuses both.
         
-        Args:
-            value: String or dict/list to expand
-            
         Returns:
-            Value with environment variables expanded
-        """
-        if isinstance(value, str):
-            # Match ${VAR_NAME} pattern
-            pattern = r'\$\{([^}]+)\}'
+            Parsed configuration dict
             
-            def replacer(match):
-                var_name = match.group(1)
-                return os.environ.get(var_name, "")
-            
-            return re.sub(pattern, replacer, value)
-        
-        elif isinstance(value, dict):
-            return {k: self._expand_env_vars(v) for k, v in value.items()}
-        
-        elif isinstance(value, list):
-            return [self._expand_env_vars(item) for item in value]
-        
-        return value
+        Raises:
+            ValueError: If the file is not valid JSON
+        """
+        st = self.config_path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._config_stamp:
+            return self._config
+        
+        raw = self.config_path.read_bytes()
+        config = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        self._config_stamp = stamp
+        self._config = config
+        self._env_expanders = {}
+        return config
     
     async def start(self) -> None:
         """
@@ -131,9 +251,8 @@ class MCPHost:
             return
         
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-        except json.JSONDecodeError as e:
+            config = self._load_config()
+        except ValueError as e:
             logger.error(f"Invalid MCP config JSON: {e}")
             return
         
@@ -167,8 +286,11 @@ class MCPHost:
             # 1. Prepare Server Parameters with env expansion
             server_env = os.environ.copy()
             if 'env' in conf:
-                expanded_env = self._expand_env_vars(conf['env'])
-                server_env.update(expanded_env)
+                expander = self._env_expanders.get(name)
+                if expander is None:
+                    expander = _compile_expander(conf['env'])
+                    self._env_expanders[name] = expander
+                server_env.update(expander(os.environ))
             
             params = StdioServerParameters(
                 command=conf['command'],
@@ -176,17 +298,23 @@ class MCPHost:
                 env=server_env
             )
             
-            # 2. Launch subprocess and connect
-            read, write = await self.exit_stack.enter_async_context(
+            # 2. Launch subprocess and connect (one stack per server so a
+            # wedged server can be abandoned without blocking the others)
+            stack = AsyncExitStack()
+            self._server_stacks[name] = stack
+            read, write = await stack.enter_async_context(
                 stdio_client(params)
             )
-            session = await self.exit_stack.enter_async_context(
+            session = await stack.enter_async_context(
                 ClientSession(read, write)
             )
             
             # 3. Initialize the session (MCP handshake)
             await session.initialize()
             self.sessions[name] = session
+            self._semaphores[name] = asyncio.Semaphore(
+                conf.get('max_concurrency', self.DEFAULT_MAX_CONCURRENCY)
+            )
             
             # 4. Discover tools from this server
             tools_response = await session.list_tools()
@@ -234,7 +362,9 @@ class MCPHost:
             raise MCPHostError(f"Server '{server_name}' is not connected.")
         
         try:
-            result = await session.call_tool(tool_name, arguments)
+            # Bound queue depth on the server's single stdio pipe
+            async with self._semaphores[server_name]:
+                result = await session.call_tool(tool_name, arguments)
             content = result.content
             
             # Extension 5: RAG Auto-Ingest
@@ -264,23 +394,19 @@ class MCPHost:
                 # Skip very short content
                 return
             
-            # Try to ingest into KnowledgeBase
+            kb = self._get_knowledge_base()
+            if kb is None:
+                return
+            
             try:
-                from .knowledge import KnowledgeBase
-                
-                kb = KnowledgeBase.get_instance()
-                if kb:
-                    # Create a virtual document from the MCP result
-                    doc_id = f"mcp://{tool_name}"
-                    kb.ingest_text(
-                        text=text,
-                        source=doc_id,
-                        metadata={"source_type": "mcp_tool", "tool": tool_name}
-                    )
-                    logger.debug(f"RAG: Auto-ingested {len(text)} chars from {tool_name}")
-            except ImportError:
-                # KnowledgeBase not available, skip
-                pass
+                # Create a virtual document from the MCP result
+                doc_id = f"mcp://{tool_name}"
+                kb.ingest_text(
+                    text=text,
+                    source=doc_id,
+                    metadata={"source_type": "mcp_tool", "tool": tool_name}
+                )
+                logger.debug(f"RAG: Auto-ingested {len(text)} chars from {tool_name}")
             except Exception as e:
                 logger.debug(f"RAG: Auto-ingest skipped: {e}")
                 
@@ -288,6 +414,32 @@ class MCPHost:
             # Never fail the tool call due to RAG issues
             logger.debug(f"RAG: Auto-ingest error (ignored): {e}")
     
+    def _get_knowledge_base(self) -> Optional[Any]:
+        """
+        Resolve the shared KnowledgeBase once and cache it on the host.
+        
+        Returns:
+            The KnowledgeBase instance, or None if unavailable
+        """
+        if not self._kb_probed:
+            self._kb_probed = True
+            try:
+                from .knowledge import KnowledgeBase
+                get_instance = getattr(KnowledgeBase, 'get_instance', None)
+                self._kb = get_instance() if get_instance else None
+            except ImportError:
+                # KnowledgeBase not available, skip
+                self._kb = None
+            except Exception as e:
+                logger.debug(f"RAG: KnowledgeBase unavailable: {e}")
+                self._kb = None
+        return self._kb
+    
+    def invalidate_kb(self) -> None:
+        """Forget the cached KnowledgeBase so the next ingest re-resolves it."""
+        self._kb = None
+        self._kb_probed = False
+    
     def _extract_text_content(self, content: Any) -> str:
         """
         Extract text from MCP content which may be various formats.
@@ -298,28 +450,12 @@ class MCPHost:
         Returns:
             Extracted text string
         """
-        if isinstance(content, str):
-            return content
-        
         if isinstance(content, list):
             # List of content blocks
-            texts = []
-            for block in content:
-                if isinstance(block, str):
-                    texts.append(block)
-                elif hasattr(block, 'text'):
-                    texts.append(block.text)
-                elif isinstance(block, dict) and 'text' in block:
-                    texts.append(block['text'])
-            return "\n".join(texts)
-        
-        if hasattr(content, 'text'):
-            return content.text
-        
-        if isinstance(content, dict) and 'text' in content:
-            return content['text']
-        
-        return ""
+            texts = [_block_text(block) for block in content]
+            return "\n".join([t for t in texts if t is not None])
+        
+        return _block_text(content) or ""
     
     def get_tools_for_llm(self) -> List[Dict[str, Any]]:
         """
@@ -370,14 +506,42 @@ class MCPHost:
         """Get list of connected server names."""
         return list(self.sessions.keys())
     
+    async def _close_server(self, name: str, stack: AsyncExitStack) -> None:
+        """
+        Close a single server's stack, bounded by SHUTDOWN_TIMEOUT.
+        
+        Cancelling the close makes stdio_client tear down its subprocess,
+        so a hung server cannot stall application exit.
+        
+        Args:
+            name: Server identifier
+            stack: Exit stack holding the server's transport and session
+        """
+        try:
+            if hasattr(asyncio, "timeout"):
+                # Python 3.11+: stays in the current task, which anyio's
+                # cancel scopes inside stdio_client require
+                async with asyncio.timeout(self.SHUTDOWN_TIMEOUT):
+                    await stack.aclose()
+            else:
+                await asyncio.wait_for(stack.aclose(), self.SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"MCP: Server '{name}' did not close within {self.SHUTDOWN_TIMEOUT}s. Abandoning.")
+        except Exception as e:
+            logger.warning(f"MCP: Error closing '{name}': {e}")
+    
     async def shutdown(self) -> None:
         """
         Gracefully close all MCP server connections.
         """
         if self._started:
             logger.info("🔌 MCP: Shutting down...")
-            await self.exit_stack.aclose()
+            # Close in reverse connection order, mirroring a single exit stack
+            for name in reversed(list(self._server_stacks)):
+                await self._close_server(name, self._server_stacks[name])
+            self._server_stacks.clear()
             self.sessions.clear()
+            self._semaphores.clear()
             self.available_tools.clear()
             self._started = False
             logger.info("✅ MCP: All connections closed.")
@@ -3,10 +3,22 @@ Conversation Memory Management for VibeChat.
 Handles chat history, context injection, and token management.
 """
 
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 
 
+# Context tier thresholds (tokens)
+_T1 = 32000  # Fits in most models
+_T2 = 128000  # Fits in GPT-4, Claude, Gemini
+
+
+@lru_cache(maxsize=8)
+def _usable_budget(model_limit: int) -> float:
+    """Context budget for a model, reserving 30% for conversation and response."""
+    return model_limit * 0.7
+
+
 @dataclass
 class ChatMemory:
     """
@@ -56,14 +68,23 @@ class ChatMemory:
             'content': content
         })
     
-    def get_messages(self) -> List[Dict[str, str]]:
+    def get_messages(self) -> Tuple[Dict[str, str], ...]:
+        """
+        Get all messages in the conversation as a read-only snapshot.
+        
+        Returns:
+            Tuple of message dictionaries (use clone_messages() to mutate)
+        """
+        return tuple(self.messages)
+    
+    def clone_messages(self) -> List[Dict[str, str]]:
         """
-        Get all messages in the conversation.
+        Get an independent, mutable copy of the conversation.
         
         Returns:
-            List of message dictionaries
+            List of copied message dictionaries
         """
-        return self.messages.copy()
+        return [dict(m) for m in self.messages]
     
     def get_context_size(self) -> int:
         """
@@ -189,8 +210,8 @@ class ContextTier:
     Helper class to determine optimal context injection strategy.
     """
     
-    TIER_1_LIMIT = 32000  # Fits in most models
-    TIER_2_LIMIT = 128000  # Fits in GPT-4, Claude, Gemini
+    TIER_1_LIMIT = _T1
+    TIER_2_LIMIT = _T2
     
     @staticmethod
     def get_tier(token_count: int) -> str:
@@ -203,12 +224,11 @@ class ContextTier:
         Returns:
             Tier description
         """
-        if token_count <= ContextTier.TIER_1_LIMIT:
+        if token_count <= _T1:
             return "TIER_1_FULL"  # Full injection, fits everywhere
-        elif token_count <= ContextTier.TIER_2_LIMIT:
+        if token_count <= _T2:
             return "TIER_2_FULL"  # Full injection, fits in large context models
-        else:
-            return "TIER_3_RAG"  # Need RAG fallback
+        return "TIER_3_RAG"  # Need RAG fallback
     
     @staticmethod
     def can_use_full_context(token_count: int, model_limit: int = 128000) -> bool:
@@ -222,6 +242,4 @@ class ContextTier:
         Returns:
             True if full context can be used
         """
-        # Reserve 30% for conversation and response
-        usable_context = model_limit * 0.7
-        return token_count <= usable_context
+        return token_count <= _usable_budget(model_limit)
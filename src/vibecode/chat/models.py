@@ -4,10 +4,133 @@ Supports OpenAI, Anthropic, Google Gemini, and Ollama with unified interface.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Iterator, Optional
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Iterator, Optional, Tuple
 import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import importlib
+import threading
 from ..config import DEFAULT_MODEL_ID
 
+logger = logging.getLogger(__name__)
+
+# Exact-match cache of deterministic (temperature == 0) responses, LRU-evicted
+_RESPONSE_CACHE_SIZE = 512
+_RESPONSE_CACHE: "OrderedDict[Tuple, str]" = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+# Optional provider SDKs (module path -> pip package), imported once on first use
+_SDK_PACKAGES = {
+    "openai": "openai",
+    "anthropic": "anthropic",
+    "google.genai": "google-genai",
+}
+_SDK_MODULES: Dict[str, object] = {}
+
+
+def _sdk(module_name: str):
+    """
+    Return an optional provider SDK module, importing it on first use.
+    
+    Raises:
+        ImportError: If the SDK is not installed
+    """
+    module = _SDK_MODULES.get(module_name)
+    if module is None:
+        package = _SDK_PACKAGES[module_name]
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            raise ImportError(
+                f"{package} not installed. Install with: pip install {package}"
+            ) from e
+        _SDK_MODULES[module_name] = module
+    return module
+
+
+# Shared HTTP session for Ollama, created on first use (keeps sockets alive between turns)
+_OLLAMA_SESSION = None
+
+
+def _get_ollama_session():
+    """Return the module-wide pooled requests.Session used by OllamaProvider."""
+    global _OLLAMA_SESSION
+    if _OLLAMA_SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        # No transport-level retries: BaseLLMProvider._retrying_stream owns retrying
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _OLLAMA_SESSION = session
+    return _OLLAMA_SESSION
+
+
+# Shared HTTP client for the OpenAI/Anthropic SDKs, created on first use
+_HTTPX_CLIENT = None
+
+
+def _get_shared_http_client():
+    """
+    Return the module-wide httpx.Client handed to the hosted-API SDKs.
+    
+    Uses HTTP/2 when the optional `h2` package is installed, so concurrent
+    requests to the same host multiplex over one TLS connection; otherwise
+    falls back to a pooled HTTP/1.1 client.
+    """
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is None:
+        import httpx
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        _HTTPX_CLIENT = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=httpx.Timeout(120.0, connect=5.0)
+        )
+    return _HTTPX_CLIENT
+
+
+def _with_shared_http_client(client_cls, **kwargs):
+    """
+    Construct an SDK client on the shared httpx.Client.
+    
+    SDK releases built on a different HTTP package reject a plain
+    httpx.Client; those fall back to the SDK's own transport.
+    """
+    try:
+        return client_cls(http_client=_get_shared_http_client(), **kwargs)
+    except TypeError as e:
+        logger.debug(f"{client_cls.__name__} rejected shared HTTP client: {e}")
+        return client_cls(**kwargs)
+
+
+# Shared async HTTP client for Ollama, created on first use
+_OLLAMA_ASYNC_CLIENT = None
+
+
+def _get_ollama_async_client():
+    """Return the module-wide pooled httpx.AsyncClient used by OllamaProvider."""
+    global _OLLAMA_ASYNC_CLIENT
+    if _OLLAMA_ASYNC_CLIENT is None:
+        import httpx
+        _OLLAMA_ASYNC_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=None
+        )
+    return _OLLAMA_ASYNC_CLIENT
+
 
 # System prompt template for all providers
 SYSTEM_PROMPT_TEMPLATE = """You are VibeChat, an expert AI developer living inside the Vibecode environment.
@@ -47,10 +170,60 @@ def corrected_function():
 
 The user has provided you with a complete codebase snapshot. Use it to provide accurate, contextual answers."""
 
+# Precomputed once: the default prompt's digest for request-cache keys
+_SYSTEM_PROMPT_HASH = hashlib.blake2b(
+    SYSTEM_PROMPT_TEMPLATE.encode("utf-8"), digest_size=16
+).hexdigest()
+
+
+def _prompt_digest(system_prompt: str) -> str:
+    """
+    Digest of a system prompt for request-cache keys.
+    
+    Not memoized: a cache keyed on the prompt would keep the (possibly
+    multi-megabyte) context strings alive. The default prompt's digest is
+    precomputed.
+    """
+    if system_prompt is SYSTEM_PROMPT_TEMPLATE:
+        return _SYSTEM_PROMPT_HASH
+    return hashlib.blake2b(system_prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Prebuilt system message for the default prompt (treated as read-only)
+_SYSTEM_MSG = {"role": "system", "content": SYSTEM_PROMPT_TEMPLATE}
+
+
+def _with_system_message(messages, system_prompt: str) -> List[Dict[str, str]]:
+    """
+    Prepend the system message for chat-style APIs in a single allocation.
+    
+    The default prompt reuses the prebuilt _SYSTEM_MSG dict; `messages` may
+    be any sequence (the chat memory hands out tuples) and is not modified.
+    """
+    if system_prompt is SYSTEM_PROMPT_TEMPLATE:
+        return [_SYSTEM_MSG, *messages]
+    return [{"role": "system", "content": system_prompt}, *messages]
+
 
 class BaseLLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
+    # chat() streams tokens by default; send_message() is for batch/programmatic use
+    default_stream = True
+    
+    # Optional durable response cache (a ResponseCache) shared across restarts
+    response_store = None
+    
+    # Transient-failure retries (429 / 5xx / timeouts): attempts and base backoff in seconds
+    retry_attempts = 4
+    retry_base_delay = 0.5
+    # Upper bound on a server-supplied Retry-After, in seconds
+    retry_max_delay = 30.0
+    
+    # (provider class, base_url, key digest) triples whose connections have already been warmed
+    _warmed: set = set()
+    _warmed_lock = threading.Lock()
+    
     def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize the provider.
@@ -69,94 +242,376 @@ class BaseLLMProvider(ABC):
         """Get API key from environment variable."""
         pass
     
-    @abstractmethod
+    def prewarm(self) -> None:
+        """
+        Open the provider's connection pool in the background.
+        
+        Moves the TCP/TLS handshake off the first user-visible request.
+        Runs at most once per (provider, base_url, API key) and never raises.
+        """
+        # Hash the key so the raw secret never sits in the class-level set
+        key_digest = hashlib.sha256(self.api_key.encode('utf-8')).hexdigest()[:16]
+        key = (self.__class__.__name__, self.base_url, key_digest)
+        with self._warmed_lock:
+            if key in BaseLLMProvider._warmed:
+                return
+            BaseLLMProvider._warmed.add(key)
+        
+        def run():
+            try:
+                self._warm_up()
+            except Exception as e:
+                logger.debug(f"Prewarm of {key[0]} failed (ignored): {e}")
+        
+        threading.Thread(target=run, name=f"prewarm-{key[0]}", daemon=True).start()
+    
+    def _warm_up(self) -> None:
+        """Issue a cheap request to populate the keep-alive pool. Override in subclasses."""
+        pass
+    
     def send_message(
         self, 
         messages: List[Dict[str, str]], 
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
-        model_id: str = DEFAULT_MODEL_ID
+        model_id: Optional[str] = None
     ) -> str:
-        """Send a message to the LLM and wait for response."""
-        pass
+        """Send a message to the LLM and wait for the complete response."""
+        return "".join(self.stream_message(messages, system_prompt, temperature, model_id))
+    
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
+        temperature: float = 0.7,
+        model_id: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Converse with the LLM, yielding text as it arrives.
+        
+        Streams token-by-token when default_stream is set, otherwise yields
+        the complete response as a single chunk.
+        """
+        if self.default_stream:
+            return self.stream_message(messages, system_prompt, temperature, model_id)
+        return iter((self.send_message(messages, system_prompt, temperature, model_id),))
     
-    @abstractmethod
     def stream_message(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
+        temperature: float = 0.7,
+        model_id: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Stream a message response from the LLM.
+        
+        Deterministic requests (temperature == 0) are served from the response
+        cache when an identical request has completed before.
+        """
+        kwargs = {"system_prompt": system_prompt, "temperature": temperature}
+        if model_id is not None:
+            kwargs["model_id"] = model_id
+        
+        if temperature != 0:
+            return self._retrying_stream(messages, kwargs)
+        
+        key = self._cache_key(messages, system_prompt, model_id)
+        with _RESPONSE_CACHE_LOCK:
+            cached = _RESPONSE_CACHE.get(key)
+            if cached is not None:
+                _RESPONSE_CACHE.move_to_end(key)
+        if cached is not None:
+            return iter((cached,))
+        
+        req_hash = None
+        if self.response_store is not None:
+            req_hash = self._request_hash(messages, system_prompt, model_id)
+            try:
+                cached = self.response_store.get_cached_response(req_hash)
+            except Exception as e:
+                logger.debug(f"Response cache lookup failed: {e}")
+            if cached is not None:
+                self._remember_response(key, cached)
+                return iter((cached,))
+        
+        return self._record_response(key, req_hash, model_id, self._retrying_stream(messages, kwargs))
+    
+    @abstractmethod
+    def _stream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = DEFAULT_MODEL_ID
     ) -> Iterator[str]:
-        """Stream a message response from the LLM."""
+        """Stream a message response from the provider's API."""
+        pass
+    
+    def _retrying_stream(self, messages: List[Dict[str, str]], kwargs: dict) -> Iterator[str]:
+        """
+        Run _stream_message, retrying transient failures with backoff.
+        
+        Only failures before the first chunk are retried. Once text has been
+        yielded the error is re-raised: a fresh generation (even at
+        temperature 0) need not reproduce the text already shown.
+        """
+        for attempt in range(self.retry_attempts):
+            emitted = False
+            try:
+                for chunk in self._stream_message(messages, **kwargs):
+                    emitted = True
+                    yield chunk
+                return
+            except Exception as e:
+                last_attempt = attempt == self.retry_attempts - 1
+                if last_attempt or emitted or not self._is_retryable(e):
+                    raise
+                delay = self._retry_delay(attempt, e)
+                logger.warning(f"{self.__class__.__name__}: transient error ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """True for rate limits, server errors, timeouts and dropped connections."""
+        response = getattr(error, 'response', None)
+        status = (
+            getattr(error, 'status_code', None)
+            or getattr(response, 'status_code', None)
+            or getattr(error, 'code', None)
+        )
+        if status in (408, 429, 500, 502, 503, 504, 529):
+            return True
+        # SDK/transport error types, matched by name so no SDK import is needed
+        return type(error).__name__ in (
+            'RateLimitError', 'APITimeoutError', 'APIConnectionError',
+            'InternalServerError', 'ServiceUnavailableError', 'OverloadedError',
+            'Timeout', 'ReadTimeout', 'ConnectTimeout', 'ConnectionError',
+            'ChunkedEncodingError', 'RemoteProtocolError', 'ReadError',
+        )
+    
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Exponential backoff with jitter, honouring a Retry-After header."""
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        if headers:
+            try:
+                retry_after = headers.get('retry-after')
+                if retry_after is not None:
+                    return min(float(retry_after), self.retry_max_delay)
+            except (TypeError, ValueError):
+                pass
+        return self.retry_base_delay * (2 ** attempt) * random.uniform(0.8, 1.2)
+    
+    async def astream_message(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
+        temperature: float = 0.7,
+        model_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Asynchronously stream a message response from the LLM.
+        
+        Lets several requests be in flight at once, e.g.
+        asyncio.gather(*(collect(p.astream_message(m)) for m in batches)).
+        """
+        kwargs = {"system_prompt": system_prompt, "temperature": temperature}
+        if model_id is not None:
+            kwargs["model_id"] = model_id
+        
+        async for chunk in self._astream_message(messages, **kwargs):
+            yield chunk
+            # Give other tasks on the loop a turn between chunks
+            await asyncio.sleep(0)
+    
+    async def _astream_message(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """
+        Async streaming hook. Providers with native async SDKs override this;
+        the default drives the synchronous stream on a worker thread.
+        """
+        iterator = self._stream_message(messages, **kwargs)
+        done = object()
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, done)
+            if chunk is done:
+                break
+            yield chunk
+    
+    def _cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: str,
+        model_id: Optional[str]
+    ) -> Tuple:
+        """
+        Build the response-cache key for a request.
+        
+        The system prompt enters as its digest: chat prompts embed the
+        codebase context, and the LRU must not keep those strings alive.
+        """
+        return (
+            self.__class__.__name__,
+            self.base_url,
+            model_id,
+            _prompt_digest(system_prompt),
+            tuple((m['role'], m['content']) for m in messages),
+        )
+    
+    def _request_hash(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: str,
+        model_id: Optional[str]
+    ) -> str:
+        """Stable hash of a request, used as the durable response-cache key."""
+        payload = json.dumps(
+            [self.__class__.__name__, self.base_url, model_id, _prompt_digest(system_prompt), list(messages)],
+            sort_keys=True
+        )
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _remember_response(key: Tuple, response: str) -> None:
+        """Insert a response into the in-memory LRU cache."""
+        with _RESPONSE_CACHE_LOCK:
+            _RESPONSE_CACHE[key] = response
+            _RESPONSE_CACHE.move_to_end(key)
+            while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+                _RESPONSE_CACHE.popitem(last=False)
+    
+    def _record_response(
+        self,
+        key: Tuple,
+        req_hash: Optional[str],
+        model_id: Optional[str],
+        stream: Iterator[str]
+    ) -> Iterator[str]:
+        """Pass chunks through, caching the full response once the stream completes."""
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        
+        response = "".join(chunks)
+        self._remember_response(key, response)
+        
+        if req_hash is not None:
+            try:
+                self.response_store.put_cached_response(
+                    req_hash, self.__class__.__name__, model_id, response
+                )
+            except Exception as e:
+                logger.debug(f"Response cache write failed: {e}")
+
+
+class SDKClientProvider(BaseLLMProvider):
+    """Base for providers that talk to their API through a vendor SDK client."""
+    
+    # Built on first use and reused so its connection pool stays warm
+    _client = None
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        super().__init__(api_key, base_url)
+        # prewarm() builds clients on a background thread while requests may start
+        self._client_lock = threading.Lock()
+    
+    @abstractmethod
+    def _create_client(self):
+        """Build the SDK client for this provider."""
         pass
+    
+    def _get_client(self):
+        """Return the cached SDK client, creating it on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
 
 
-class GoogleProvider(BaseLLMProvider):
+class AsyncSDKClientProvider(SDKClientProvider):
+    """SDK provider that also has a native async client for astream_message."""
+    
+    _async_client = None
+    
+    @abstractmethod
+    def _create_async_client(self):
+        """Build the async SDK client for this provider."""
+        pass
+    
+    def _get_async_client(self):
+        """Return the cached async SDK client, creating it on first use."""
+        if self._async_client is None:
+            with self._client_lock:
+                if self._async_client is None:
+                    self._async_client = self._create_async_client()
+        return self._async_client
+
+
+class GoogleProvider(SDKClientProvider):
     """Google Gemini provider."""
     
     def _get_api_key_from_env(self) -> Optional[str]:
         return os.getenv('GOOGLE_API_KEY')
     
-    def send_message(
+    def _create_client(self):
+        return _sdk("google.genai").Client(api_key=self.api_key)
+    
+    def _warm_up(self) -> None:
+        # Constructing the pager fetches the first page of models
+        self._get_client().models.list()
+    
+    @staticmethod
+    def _format_gemini_prompt(messages: List[Dict[str, str]], system_prompt: str) -> str:
+        """
+        Flatten the conversation into Gemini's single-prompt format.
+        
+        Built with one join rather than repeated += so long histories stay O(N).
+        """
+        parts = [system_prompt]
+        parts.extend(
+            f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}"
+            for msg in messages
+        )
+        parts.append("Assistant:")
+        return "\n\n".join(parts)
+    
+    def _stream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = DEFAULT_MODEL_ID
-    ) -> str:
-        """Send message to Google Gemini."""
-        try:
-            from google import genai
-            from google.genai import types
-        except ImportError:
-            raise ImportError(
-                "google-genai not installed. "
-                "Install with: pip install google-genai"
-            )
-        
-        client = genai.Client(api_key=self.api_key)
+    ) -> Iterator[str]:
+        """Stream message from Google Gemini."""
+        types = _sdk("google.genai").types
+        client = self._get_client()
         
-        # Convert messages to Gemini format
-        # Gemini uses a simpler format - just concatenate with role labels
-        full_prompt = system_prompt + "\n\n"
-        for msg in messages:
-            role_label = "User" if msg['role'] == 'user' else "Assistant"
-            full_prompt += f"{role_label}: {msg['content']}\n\n"
-        full_prompt += "Assistant:"
+        full_prompt = self._format_gemini_prompt(messages, system_prompt)
         
-        response = client.models.generate_content(
+        # Use streaming with the new SDK
+        for chunk in client.models.generate_content_stream(
             model=model_id,
             contents=full_prompt,
             config=types.GenerateContentConfig(temperature=temperature)
-        )
-        return response.text
+        ):
+            if chunk.text:
+                yield chunk.text
     
-    def stream_message(
+    async def _astream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = DEFAULT_MODEL_ID
-    ) -> Iterator[str]:
-        """Stream message from Google Gemini."""
-        try:
-            from google import genai
-            from google.genai import types
-        except ImportError:
-            raise ImportError("google-genai not installed.")
+    ) -> AsyncIterator[str]:
+        """Stream message from Google Gemini using the SDK's async surface."""
+        types = _sdk("google.genai").types
         
-        client = genai.Client(api_key=self.api_key)
+        client = self._get_client()
+        full_prompt = self._format_gemini_prompt(messages, system_prompt)
         
-        # Convert messages to Gemini format
-        full_prompt = system_prompt + "\n\n"
-        for msg in messages:
-            role_label = "User" if msg['role'] == 'user' else "Assistant"
-            full_prompt += f"{role_label}: {msg['content']}\n\n"
-        full_prompt += "Assistant:"
-        
-        # Use streaming with the new SDK
-        for chunk in client.models.generate_content_stream(
+        async for chunk in await client.aio.models.generate_content_stream(
             model=model_id,
             contents=full_prompt,
             config=types.GenerateContentConfig(temperature=temperature)
@@ -165,126 +620,137 @@ class GoogleProvider(BaseLLMProvider):
                 yield chunk.text
 
 
-class OpenAIProvider(BaseLLMProvider):
+class OpenAIProvider(AsyncSDKClientProvider):
     """OpenAI GPT provider."""
     
     def _get_api_key_from_env(self) -> Optional[str]:
         return os.getenv('OPENAI_API_KEY')
     
-    def send_message(
+    def _create_client(self):
+        return _with_shared_http_client(
+            _sdk("openai").OpenAI, api_key=self.api_key, base_url=self.base_url,
+            max_retries=0  # _retrying_stream is the only retry layer
+        )
+    
+    def _warm_up(self) -> None:
+        self._get_client().models.list()
+    
+    def _create_async_client(self):
+        return _sdk("openai").AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+    
+    def _stream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = "gpt-4o"
-    ) -> str:
-        """Send message to OpenAI."""
-        try:
-            from openai import OpenAI
-        except ImportError:
-            raise ImportError("openai not installed.")
-        
-        client = OpenAI(api_key=self.api_key, base_url=self.base_url)
-        
-        # Add system message
-        api_messages = [{"role": "system", "content": system_prompt}] + messages
+    ) -> Iterator[str]:
+        """Stream message from OpenAI."""
+        client = self._get_client()
         
-        response = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model=model_id,
-            messages=api_messages,
-            temperature=temperature
+            messages=_with_system_message(messages, system_prompt),
+            temperature=temperature,
+            stream=True
         )
-        return response.choices[0].message.content
+        
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     
-    def stream_message(
+    async def _astream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = "gpt-4o"
-    ) -> Iterator[str]:
-        """Stream message from OpenAI."""
-        try:
-            from openai import OpenAI
-        except ImportError:
-            raise ImportError("openai not installed.")
-        
-        client = OpenAI(api_key=self.api_key, base_url=self.base_url)
-        
-        # Add system message
-        api_messages = [{"role": "system", "content": system_prompt}] + messages
+    ) -> AsyncIterator[str]:
+        """Stream message from OpenAI with AsyncOpenAI."""
+        client = self._get_async_client()
         
-        stream = client.chat.completions.create(
+        stream = await client.chat.completions.create(
             model=model_id,
-            messages=api_messages,
+            messages=_with_system_message(messages, system_prompt),
             temperature=temperature,
             stream=True
         )
         
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
 
 
-class AnthropicProvider(BaseLLMProvider):
+class AnthropicProvider(AsyncSDKClientProvider):
     """Anthropic Claude provider."""
     
     def _get_api_key_from_env(self) -> Optional[str]:
         return os.getenv('ANTHROPIC_API_KEY')
     
-    def send_message(
+    def _create_client(self):
+        return _with_shared_http_client(
+            _sdk("anthropic").Anthropic, api_key=self.api_key, base_url=self.base_url,
+            max_retries=0  # _retrying_stream is the only retry layer
+        )
+    
+    def _warm_up(self) -> None:
+        self._get_client().models.list(limit=1)
+    
+    @staticmethod
+    def _system_blocks(system_prompt: str) -> List[Dict]:
+        """
+        Send the system prompt as a cacheable block.
+        
+        The system prompt (persona + codebase context) is identical across
+        turns, so Anthropic can serve it from its prompt cache at reduced cost.
+        """
+        return [{
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": {"type": "ephemeral"}
+        }]
+    
+    def _create_async_client(self):
+        return _sdk("anthropic").AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
+    
+    def _stream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = "claude-3-5-sonnet-20241022"
-    ) -> str:
-        """Send message to Anthropic."""
-        try:
-            from anthropic import Anthropic
-        except ImportError:
-            raise ImportError(
-                "anthropic not installed. "
-                "Install with: pip install anthropic"
-            )
-        
-        client = Anthropic(api_key=self.api_key, base_url=self.base_url)
+    ) -> Iterator[str]:
+        """Stream message from Anthropic."""
+        client = self._get_client()
         
-        response = client.messages.create(
+        with client.messages.stream(
             model=model_id,
             max_tokens=4096,
-            system=system_prompt,
+            system=self._system_blocks(system_prompt),
             messages=messages,
             temperature=temperature
-        )
-        return response.content[0].text
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
     
-    def stream_message(
+    async def _astream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = "claude-3-5-sonnet-20241022"
-    ) -> Iterator[str]:
-        """Stream message from Anthropic."""
-        try:
-            from anthropic import Anthropic
-        except ImportError:
-            raise ImportError(
-                "anthropic not installed. "
-                "Install with: pip install anthropic"
-            )
-        
-        client = Anthropic(api_key=self.api_key, base_url=self.base_url)
+    ) -> AsyncIterator[str]:
+        """Stream message from Anthropic with AsyncAnthropic."""
+        client = self._get_async_client()
         
-        with client.messages.stream(
+        async with client.messages.stream(
             model=model_id,
             max_tokens=4096,
-            system=system_prompt,
-            messages=messages,
+            system=self._system_blocks(system_prompt),
+            messages=list(messages),
             temperature=temperature
         ) as stream:
-            for text in stream.text_stream:
+            async for text in stream.text_stream:
                 yield text
 
 
@@ -305,62 +771,61 @@ class OllamaProvider(BaseLLMProvider):
     def _get_api_key_from_env(self) -> Optional[str]:
         return os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
     
-    def send_message(
+    def _warm_up(self) -> None:
+        _get_ollama_session().get(f"{self.base_url}/api/tags", timeout=5)
+    
+    def _stream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = "llama2"
-    ) -> str:
-        """Send message to Ollama."""
-        import requests
-        
-        # Add system message to the beginning
-        full_messages = [{"role": "system", "content": system_prompt}] + messages
-        
-        response = requests.post(
+    ) -> Iterator[str]:
+        """Stream message from Ollama."""
+        response = _get_ollama_session().post(
             f"{self.base_url}/api/chat",
             json={
                 "model": model_id,
-                "messages": full_messages,
-                "stream": False,
+                "messages": _with_system_message(messages, system_prompt),
+                "stream": True,
                 "options": {"temperature": temperature}
-            }
+            },
+            stream=True
         )
         response.raise_for_status()
-        return response.json()['message']['content']
+        
+        # Close on exit so an abandoned stream hands its socket back to the pool
+        with response:
+            for line in response.iter_lines():
+                if line:
+                    chunk = json.loads(line)
+                    if 'message' in chunk and 'content' in chunk['message']:
+                        yield chunk['message']['content']
     
-    def stream_message(
+    async def _astream_message(
         self,
         messages: List[Dict[str, str]],
         system_prompt: str = SYSTEM_PROMPT_TEMPLATE,
         temperature: float = 0.7,
         model_id: str = "llama2"
-    ) -> Iterator[str]:
-        """Stream message from Ollama."""
-        import requests
-        import json as json_lib
-        
-        # Add system message to the beginning
-        full_messages = [{"role": "system", "content": system_prompt}] + messages
-        
-        response = requests.post(
+    ) -> AsyncIterator[str]:
+        """Stream message from Ollama over the shared httpx.AsyncClient."""
+        async with _get_ollama_async_client().stream(
+            "POST",
             f"{self.base_url}/api/chat",
             json={
                 "model": model_id,
-                "messages": full_messages,
+                "messages": _with_system_message(messages, system_prompt),
                 "stream": True,
                 "options": {"temperature": temperature}
-            },
-            stream=True
-        )
-        response.raise_for_status()
-        
-        for line in response.iter_lines():
-            if line:
-                chunk = json_lib.loads(line)
-                if 'message' in chunk and 'content' in chunk['message']:
-                    yield chunk['message']['content']
+            }
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    chunk = json.loads(line)
+                    if 'message' in chunk and 'content' in chunk['message']:
+                        yield chunk['message']['content']
 
 
 def get_provider(provider_name: str, api_key: Optional[str] = None, base_url: Optional[str] = None) -> BaseLLMProvider:
@@ -399,6 +864,9 @@ def get_provider(provider_name: str, api_key: Optional[str] = None, base_url: Op
     # Ollama provider handles base_url differently (in constructor default), 
     # but we can pass it if provided
     if provider_name.lower() == 'ollama' and base_url:
-        return provider_class(api_key=api_key, base_url=base_url)
-        
-    return provider_class(api_key=api_key, base_url=base_url)
+        provider = provider_class(api_key=api_key, base_url=base_url)
+    else:
+        provider = provider_class(api_key=api_key, base_url=base_url)
+    
+    provider.prewarm()
+    return provider
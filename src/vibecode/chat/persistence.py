@@ -10,9 +10,90 @@ ECR #007: Scalable RAG Persistence Layer
 
 import sqlite3
 import os
+import zlib
 import hashlib
-from typing import Optional, List, Tuple
-from datetime import datetime
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Iterable, Optional, List, Set, Tuple, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Values of file_cache.encoding
+ENCODING_PLAIN = 0  # Text stored in `content`
+ENCODING_ZLIB = 1  # zlib-compressed UTF-8 in `content_blob`
+ENCODING_ZSTD = 2  # zstd-compressed UTF-8 in `content_blob`
+
+# zstd contexts are not thread-safe; keep one pair per thread
+_zstd_local = threading.local()
+
+
+def _zstd_contexts():
+    """Return this thread's (compressor, decompressor) pair."""
+    if not hasattr(_zstd_local, 'cctx'):
+        _zstd_local.cctx = zstandard.ZstdCompressor(level=3)
+        _zstd_local.dctx = zstandard.ZstdDecompressor()
+    return _zstd_local.cctx, _zstd_local.dctx
+
+
+def _pack_content(content: str) -> Tuple[str, Optional[bytes], int]:
+    """
+    Compress text for storage.
+    
+    Returns:
+        (content column, content_blob column, encoding). Falls back to plain
+        text when compression does not make the payload smaller.
+    """
+    raw = content.encode('utf-8')
+    if ZSTD_AVAILABLE:
+        packed, encoding = _zstd_contexts()[0].compress(raw), ENCODING_ZSTD
+    else:
+        packed, encoding = zlib.compress(raw, 6), ENCODING_ZLIB
+    if len(packed) >= len(raw):
+        return content, None, ENCODING_PLAIN
+    return '', packed, encoding
+
+
+def _unpack_content(content: str, blob: Optional[bytes], encoding: Optional[int]) -> str:
+    """Inverse of _pack_content."""
+    if not encoding:
+        return content
+    if encoding == ENCODING_ZLIB:
+        return zlib.decompress(blob).decode('utf-8')
+    if encoding == ENCODING_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Content was stored with zstd but zstandard is not installed.")
+        return _zstd_contexts()[1].decompress(blob).decode('utf-8')
+    raise ValueError(f"Unknown content encoding: {encoding}")
+
+
+def _hash_content(content: Union[str, bytes]) -> str:
+    """
+    Fingerprint file content for change detection.
+    
+    BLAKE2b (128-bit digest) is faster per byte than MD5; raw bytes are
+    hashed as-is so callers that read from disk skip a decode/encode round trip.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class _ThreadConnection:
+    """Per-thread holder whose collection (at thread exit) releases the connection."""
+    
+    __slots__ = ('conn', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
 
 
 class ContentDB:
@@ -23,10 +104,54 @@ class ContentDB:
     Features:
     - Hash-based change detection (skip unchanged files)
     - On-demand content retrieval (lazy loading)
-    - Thread-safe connections
+    - One connection per thread (WAL lets readers run alongside the writer)
     """
     
-    SCHEMA_VERSION = 1
+    SCHEMA_VERSION = 2
+    
+    # Decompressed contents kept in memory for hot files
+    _CONTENT_CACHE_SIZE = 128
+    
+    # Stay under SQLite's bound-parameter limit (999 on older builds)
+    _MAX_SQL_VARS = 900
+    
+    _UPSERT_SQL = """
+        INSERT OR REPLACE INTO file_cache 
+        (file_path, file_hash, content, content_blob, encoding, file_size, line_count, mtime_ns)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    _SELECT_HASH_SQL = "SELECT file_hash, file_size, mtime_ns FROM file_cache WHERE file_path=?"
+    _SELECT_CONTENT_SQL = "SELECT content, content_blob, encoding FROM file_cache WHERE file_path=?"
+    _SELECT_STAT_SQL = "SELECT CAST(value AS INTEGER) FROM metadata WHERE key=?"
+    
+    # Keep file_count/total_size in metadata current so stats are O(1) lookups.
+    # REPLACE fires the delete trigger for the old row (recursive_triggers=ON).
+    _STATS_TRIGGERS = (
+        """
+        CREATE TRIGGER IF NOT EXISTS file_cache_stats_insert AFTER INSERT ON file_cache
+        BEGIN
+            UPDATE metadata SET value = CAST(value AS INTEGER) + 1 WHERE key = 'file_count';
+            UPDATE metadata SET value = CAST(value AS INTEGER) + IFNULL(NEW.file_size, 0)
+                WHERE key = 'total_size';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS file_cache_stats_delete AFTER DELETE ON file_cache
+        BEGIN
+            UPDATE metadata SET value = CAST(value AS INTEGER) - 1 WHERE key = 'file_count';
+            UPDATE metadata SET value = CAST(value AS INTEGER) - IFNULL(OLD.file_size, 0)
+                WHERE key = 'total_size';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS file_cache_stats_update AFTER UPDATE OF file_size ON file_cache
+        BEGIN
+            UPDATE metadata SET value = CAST(value AS INTEGER)
+                - IFNULL(OLD.file_size, 0) + IFNULL(NEW.file_size, 0)
+                WHERE key = 'total_size';
+        END
+        """,
+    )
     
     def __init__(self, db_path: str):
         """
@@ -36,80 +161,198 @@ class ContentDB:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: Set[sqlite3.Connection] = set()
+        self._lock = threading.Lock()
+        self._content_cache: "OrderedDict[str, str]" = OrderedDict()
         self._init_db()
     
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening and configuring it on first use."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            # Only this thread uses the connection; the flag just lets close() reach it
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL + NORMAL sync: durable, but no fsync per transaction on the main DB
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+            conn.execute("PRAGMA recursive_triggers=ON")
+            holder = _ThreadConnection(conn)
+            # Thread-local storage is dropped when the thread exits; close with it
+            # so short-lived workers don't leave a connection behind each
+            weakref.finalize(holder, self._release_connection, self._lock, self._connections, conn)
+            self._local.holder = holder
+            with self._lock:
+                self._connections.add(conn)
+        return holder.conn
+    
+    @staticmethod
+    def _release_connection(lock: threading.Lock, connections: set, conn: sqlite3.Connection):
+        """Close a finished thread's connection unless close() already did."""
+        with lock:
+            if conn not in connections:
+                return
+            connections.discard(conn)
+        conn.close()
+    
     def _init_db(self):
         """Initialize database schema."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
+        conn = self._conn()
         
         # Schema: Path is ID, Hash for change detection, Content for RAG retrieval
-        self.cursor.execute("""
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS file_cache (
                 file_path TEXT PRIMARY KEY,
                 file_hash TEXT NOT NULL,
                 content TEXT NOT NULL,
+                content_blob BLOB,
+                encoding INTEGER DEFAULT 0,
                 file_size INTEGER,
                 line_count INTEGER,
+                mtime_ns INTEGER,
                 last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
         
+        # Schema v1 -> v2: compressed content columns and source mtime
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(file_cache)")}
+        if 'content_blob' not in columns:
+            conn.execute("ALTER TABLE file_cache ADD COLUMN content_blob BLOB")
+        if 'encoding' not in columns:
+            conn.execute("ALTER TABLE file_cache ADD COLUMN encoding INTEGER DEFAULT 0")
+        if 'mtime_ns' not in columns:
+            conn.execute("ALTER TABLE file_cache ADD COLUMN mtime_ns INTEGER")
+        
         # Metadata table for version tracking
-        self.cursor.execute("""
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS metadata (
                 key TEXT PRIMARY KEY,
                 value TEXT
             )
         """)
         
+        # Seed running stats from the table once, then let triggers maintain them
+        conn.execute("""
+            INSERT OR IGNORE INTO metadata (key, value)
+            SELECT 'file_count', COUNT(*) FROM file_cache
+        """)
+        conn.execute("""
+            INSERT OR IGNORE INTO metadata (key, value)
+            SELECT 'total_size', IFNULL(SUM(file_size), 0) FROM file_cache
+        """)
+        for trigger_sql in self._STATS_TRIGGERS:
+            conn.execute(trigger_sql)
+        
         # Set schema version
-        self.cursor.execute("""
-            INSERT OR IGNORE INTO metadata (key, value) VALUES ('schema_version', ?)
+        conn.execute("""
+            INSERT OR REPLACE INTO metadata (key, value) VALUES ('schema_version', ?)
         """, (str(self.SCHEMA_VERSION),))
         
-        self.conn.commit()
+        conn.commit()
     
-    def needs_update(self, file_path: str, content: str) -> bool:
+    def needs_update(
+        self,
+        file_path: str,
+        content: Union[str, bytes],
+        mtime_ns: Optional[int] = None
+    ) -> bool:
         """
         Checks if file has changed since last ingest.
         
+        Cheap checks run first: an unchanged mtime means clean, a different
+        text length means dirty. Only same-size text is hashed.
+        
         Args:
             file_path: Relative path to the file
-            content: Current file content
+            content: Current file content (text, or raw bytes as read from disk)
+            mtime_ns: The file's os.stat().st_mtime_ns, if known
             
         Returns:
             True if file needs to be updated, False if unchanged
         """
-        current_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-        row = self.cursor.execute(
-            "SELECT file_hash FROM file_cache WHERE file_path=?", 
-            (file_path,)
-        ).fetchone()
+        row = self._conn().execute(self._SELECT_HASH_SQL, (file_path,)).fetchone()
+        if not row:
+            return True
+        
+        cached_hash, cached_size, cached_mtime = row
+        if mtime_ns is not None and cached_mtime == mtime_ns:
+            return False
+        # file_size counts characters, so only text can be compared directly
+        if isinstance(content, str) and cached_size is not None and cached_size != len(content):
+            return True
         
-        if row and row[0] == current_hash:
-            return False  # No update needed
-        return True
+        return cached_hash != _hash_content(content)
     
-    def upsert_file(self, file_path: str, content: str):
+    def upsert_file(
+        self,
+        file_path: str,
+        content: str,
+        content_bytes: Optional[bytes] = None,
+        mtime_ns: Optional[int] = None,
+        line_count: Optional[int] = None
+    ):
         """
         Insert or Update file content.
         
         Args:
             file_path: Relative path to the file
             content: File content to store
+            content_bytes: Raw bytes of the file, if the caller has them (hashed directly)
+            mtime_ns: The file's os.stat().st_mtime_ns, enabling the mtime fast path
+            line_count: Number of lines, if the caller already knows it (skips a rescan)
         """
-        file_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-        file_size = len(content)
-        line_count = content.count('\n') + 1
+        conn = self._conn()
+        conn.execute(
+            self._UPSERT_SQL,
+            self._file_row(file_path, content, content_bytes, mtime_ns, line_count)
+        )
+        conn.commit()
+        with self._lock:
+            self._content_cache.pop(file_path, None)
+    
+    def upsert_files(self, items: Iterable[Tuple]):
+        """
+        Insert or Update many files in a single transaction.
         
-        self.cursor.execute("""
-            INSERT OR REPLACE INTO file_cache 
-            (file_path, file_hash, content, file_size, line_count, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (file_path, file_hash, content, file_size, line_count, datetime.now()))
-        self.conn.commit()
+        Args:
+            items: (file_path, content[, mtime_ns[, line_count]]) tuples
+        """
+        rows = [
+            self._file_row(
+                item[0], item[1], None,
+                item[2] if len(item) > 2 else None,
+                item[3] if len(item) > 3 else None
+            )
+            for item in items
+        ]
+        if not rows:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany(self._UPSERT_SQL, rows)
+        with self._lock:
+            for row in rows:
+                self._content_cache.pop(row[0], None)
+    
+    @staticmethod
+    def _file_row(
+        file_path: str,
+        content: str,
+        content_bytes: Optional[bytes] = None,
+        mtime_ns: Optional[int] = None,
+        line_count: Optional[int] = None
+    ) -> tuple:
+        """Build the file_cache row for a file."""
+        file_hash = _hash_content(content_bytes if content_bytes is not None else content)
+        file_size = len(content)
+        if line_count is None:
+            line_count = content.count('\n') + 1
+        stored, blob, encoding = _pack_content(content)
+        return (file_path, file_hash, stored, blob, encoding, file_size, line_count, mtime_ns)
     
     def get_content(self, file_path: str) -> Optional[str]:
         """
@@ -121,31 +364,49 @@ class ContentDB:
         Returns:
             File content if found, None otherwise
         """
-        row = self.cursor.execute(
-            "SELECT content FROM file_cache WHERE file_path=?", 
-            (file_path,)
-        ).fetchone()
-        return row[0] if row else None
+        with self._lock:
+            cached = self._content_cache.get(file_path)
+            if cached is not None:
+                self._content_cache.move_to_end(file_path)
+                return cached
+        
+        row = self._conn().execute(self._SELECT_CONTENT_SQL, (file_path,)).fetchone()
+        if not row:
+            return None
+        try:
+            content = _unpack_content(*row)
+        except Exception as e:
+            logger.error(f"Failed to decode cached content for {file_path}: {e}")
+            return None
+        
+        with self._lock:
+            self._content_cache[file_path] = content
+            if len(self._content_cache) > self._CONTENT_CACHE_SIZE:
+                self._content_cache.popitem(last=False)
+        return content
     
     def get_all_paths(self) -> List[str]:
         """Get all file paths in the cache."""
-        rows = self.cursor.execute("SELECT file_path FROM file_cache").fetchall()
+        rows = self._conn().execute("SELECT file_path FROM file_cache").fetchall()
         return [row[0] for row in rows]
     
     def get_file_count(self) -> int:
         """Get the number of files in the cache."""
-        row = self.cursor.execute("SELECT COUNT(*) FROM file_cache").fetchone()
+        row = self._conn().execute(self._SELECT_STAT_SQL, ('file_count',)).fetchone()
         return row[0] if row else 0
     
     def get_total_size(self) -> int:
         """Get total size of all cached content in bytes."""
-        row = self.cursor.execute("SELECT SUM(file_size) FROM file_cache").fetchone()
-        return row[0] or 0
+        row = self._conn().execute(self._SELECT_STAT_SQL, ('total_size',)).fetchone()
+        return (row[0] or 0) if row else 0
     
     def delete_file(self, file_path: str):
         """Remove a file from the cache."""
-        self.cursor.execute("DELETE FROM file_cache WHERE file_path=?", (file_path,))
-        self.conn.commit()
+        conn = self._conn()
+        conn.execute("DELETE FROM file_cache WHERE file_path=?", (file_path,))
+        conn.commit()
+        with self._lock:
+            self._content_cache.pop(file_path, None)
     
     def delete_missing_files(self, existing_paths: List[str]):
         """
@@ -156,25 +417,125 @@ class ContentDB:
         """
         if not existing_paths:
             return
-            
-        cached_paths = set(self.get_all_paths())
-        existing_set = set(existing_paths)
-        orphaned = cached_paths - existing_set
         
-        for path in orphaned:
-            self.delete_file(path)
+        conn = self._conn()
+        with conn:
+            if len(existing_paths) <= self._MAX_SQL_VARS:
+                placeholders = ",".join("?" * len(existing_paths))
+                conn.execute(
+                    f"DELETE FROM file_cache WHERE file_path NOT IN ({placeholders})",
+                    existing_paths
+                )
+            else:
+                # Too many for bound parameters: stage the keep-list in a temp table
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_paths (p TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM keep_paths")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO keep_paths (p) VALUES (?)",
+                    ((path,) for path in existing_paths)
+                )
+                conn.execute(
+                    "DELETE FROM file_cache WHERE file_path NOT IN (SELECT p FROM keep_paths)"
+                )
+                conn.execute("DELETE FROM keep_paths")
+        with self._lock:
+            self._content_cache.clear()
     
     def clear(self):
         """Clear all cached content."""
-        self.cursor.execute("DELETE FROM file_cache")
-        self.conn.commit()
+        conn = self._conn()
+        conn.execute("DELETE FROM file_cache")
+        conn.commit()
+        with self._lock:
+            self._content_cache.clear()
     
     def close(self):
-        """Close the database connection."""
-        self.conn.close()
+        """Close the database connections of all threads."""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
     
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+class ResponseCache:
+    """
+    Durable cache of deterministic LLM responses, keyed by request hash.
+    
+    Kept apart from ContentDB: it holds one small table, shared by every
+    project, behind a single connection.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the response cache database.
+        
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        # Providers call in from worker threads; the lock serializes access
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                req_hash TEXT PRIMARY KEY,
+                provider TEXT,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_response_created ON response_cache(created_at)
+        """)
+        self._db.commit()
+    
+    def get_cached_response(self, req_hash: str) -> Optional[str]:
+        """
+        Look up a cached LLM response.
+        
+        Args:
+            req_hash: Hash of the request (provider, model, prompt, messages)
+            
+        Returns:
+            Cached response text if found, None otherwise
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response FROM response_cache WHERE req_hash=?",
+                (req_hash,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def put_cached_response(self, req_hash: str, provider: str, model: Optional[str], response: str):
+        """
+        Store an LLM response for later reuse.
+        
+        Args:
+            req_hash: Hash of the request (provider, model, prompt, messages)
+            provider: Provider name the response came from
+            model: Model ID used, if known
+            response: Full response text
+        """
+        with self._lock:
+            self._db.execute("""
+                INSERT OR REPLACE INTO response_cache (req_hash, provider, model, response)
+                VALUES (?, ?, ?, ?)
+            """, (req_hash, provider, model, response))
+            self._db.commit()
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
@@ -3,23 +3,14 @@ Command-Line Interface for VibeCode.
 """
 import typer
 import os
-import re
-import json
-import zlib
-import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.panel import Panel
 
-# Try importing pypdf, handle case if not installed
-try:
-    from pypdf import PdfReader
-except ImportError:
-    PdfReader = None
-
-from .engine import ProjectEngine
-from .gui import run_gui
+# Heavy dependencies (PyQt6 via .gui, pydantic/renderers via .engine, pypdf,
+# rich widgets) are imported inside the commands that use them, so
+# `vibecode --help` and shell completion start quickly.
 
 app = typer.Typer(
     help="Vibecode: Codebase-to-PDF snapshot generator."
@@ -27,6 +18,168 @@ app = typer.Typer(
 
 console = Console()
 
+# Visual-scrape sentinels (the per-file headers of the LLM renderer)
+SCRAPE_START = "--- START_FILE: "
+SCRAPE_NAME_END = " ---\n"
+SCRAPE_END = "--- END_FILE ---"
+_STRIP_BACKSLASHES = {ord("\\"): None}
+
+
+def _iter_scraped_blocks(text: str):
+    """
+    Yield (filename, content) for each START_FILE/END_FILE block in text.
+    
+    One forward str.find pass; backslashes (PDF extraction escapes) are
+    stripped from each emitted block only, rather than from the whole text.
+    """
+    pos = 0
+    while True:
+        start = text.find(SCRAPE_START, pos)
+        if start == -1:
+            return
+        name_end = text.find(SCRAPE_NAME_END, start + len(SCRAPE_START))
+        if name_end == -1:
+            return
+        content_start = name_end + len(SCRAPE_NAME_END)
+        end = text.find(SCRAPE_END, content_start)
+        if end == -1:
+            return
+        yield (
+            text[start + len(SCRAPE_START):name_end].translate(_STRIP_BACKSLASHES),
+            text[content_start:end].translate(_STRIP_BACKSLASHES)
+        )
+        pos = end + len(SCRAPE_END)
+
+
+# Flags for restoring files as raw bytes (O_BINARY only exists on Windows)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+_RESTORE_WORKERS = 8
+
+
+def _write_file_bytes(path: str, data: bytes) -> None:
+    """Write bytes straight to a file descriptor, bypassing the text layer."""
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _is_empty_dir(path: str) -> bool:
+    """True if path does not exist yet or is a directory with no entries."""
+    try:
+        with os.scandir(path) as it:
+            return next(it, None) is None
+    except FileNotFoundError:
+        return True
+    except OSError:
+        return False
+
+
+def _restore_files(file_map: dict, output_dir: str):
+    """
+    Write manifest files under output_dir in one batched pass.
+    
+    Unsafe (absolute or parent-escaping) paths are skipped. Each parent
+    directory is created once, then the pre-encoded files are written on a
+    small thread pool. When output_dir is new or empty (the common case)
+    nothing below it can exist yet, so missing directories are created
+    with a bare os.mkdir per new path component instead of os.makedirs'
+    existence checks. Paths differing only in case merge into one directory
+    on case-insensitive filesystems, as they did with os.makedirs.
+    
+    Returns:
+        Tuple of (number of files restored, list of skipped paths)
+    """
+    out_root = os.path.normpath(output_dir)
+    targets = []
+    skipped = []
+    for rel_path, content in file_map.items():
+        # Security check
+        safe_path = os.path.normpath(rel_path)
+        if safe_path.startswith("..") or os.path.isabs(safe_path):
+            skipped.append(rel_path)
+            continue
+        targets.append((os.path.join(out_root, safe_path), content.encode('utf-8')))
+    
+    directories = {os.path.dirname(path) for path, _ in targets}
+    if _is_empty_dir(out_root):
+        os.makedirs(out_root, exist_ok=True)
+        created = {out_root}
+        for directory in directories:
+            # Collect the not-yet-created ancestors, then mkdir them top-down
+            missing = []
+            while directory not in created:
+                missing.append(directory)
+                directory = os.path.dirname(directory)
+            for path in reversed(missing):
+                try:
+                    os.mkdir(path)
+                except FileExistsError:
+                    pass  # Case-only twin (Src/ vs src/) on a case-insensitive filesystem
+                created.add(path)
+    else:
+        for directory in directories:
+            os.makedirs(directory, exist_ok=True)
+    
+    with ThreadPoolExecutor(max_workers=_RESTORE_WORKERS) as pool:
+        # list() re-raises the first write error, if any
+        list(pool.map(lambda target: _write_file_bytes(*target), targets))
+    
+    return len(targets), skipped
+
+
+def _scan_pdf_text(reader, keep_text: bool = False):
+    """
+    Pull the Digital Twin manifest payload out of a PDF page by page.
+    
+    Pages are scanned as they are extracted and reading stops once the end
+    sentinel is seen, so large snapshots never hold their whole text in
+    memory. With keep_text (needed for --force-scrape) every page is read
+    and the full text is returned as well.
+    
+    Args:
+        reader: pypdf PdfReader
+        keep_text: Also collect the text of every page
+        
+    Returns:
+        Tuple of (payload or None, full text or None)
+    """
+    from .manifest import MANIFEST_START, MANIFEST_END
+    
+    page_texts = []
+    manifest_parts = None  # text after the start sentinel, once seen
+    payload = None
+    
+    for page in reader.pages:
+        text = page.extract_text()
+        if not text:
+            continue
+        text += "\n"
+        if keep_text:
+            page_texts.append(text)
+        if payload is not None:
+            continue
+        
+        # Pages are newline-separated, so a sentinel never spans two pages
+        if manifest_parts is None:
+            start = text.find(MANIFEST_START)
+            if start == -1:
+                continue
+            text = text[start + len(MANIFEST_START):]
+            manifest_parts = []
+        manifest_parts.append(text)
+        
+        if MANIFEST_END in text:
+            joined = "".join(manifest_parts)
+            payload = joined[:joined.find(MANIFEST_END)].strip()
+            if not keep_text:
+                break
+    
+    return payload, ("".join(page_texts) if keep_text else None)
+
 
 @app.command(name="human", help="Generate a human-readable, syntax-highlighted PDF.")
 def run_human(
@@ -43,6 +196,10 @@ def run_human(
     """
     Generate a Human-Readable PDF with syntax highlighting.
     """
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from .engine import ProjectEngine
+    
     console.print(
         Panel.fit(
             f"[bold blue]Generating HUMAN-readable PDF[/bold blue]\nConfig: {config_path}",
@@ -86,6 +243,10 @@ def run_llm(
     """
     Generate an LLM-optimized PDF for AI context injection.
     """
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from .engine import ProjectEngine
+    
     console.print(
         Panel.fit(
             f"[bold magenta]Generating LLM-optimized PDF[/bold magenta]\nConfig: {config_path}",
@@ -124,6 +285,10 @@ def run_unpack(
     force_scrape: bool = typer.Option(
         False, "--force-scrape",
         help="EMERGENCY ONLY: Attempt lossy text scraping if manifest is corrupt."
+    ),
+    verbose: bool = typer.Option(
+        False, "--verbose",
+        help="List every file recovered by --force-scrape."
     )
 ):
     """
@@ -134,9 +299,16 @@ def run_unpack(
     
     ECR #006: Silent fallback has been DISABLED to protect code integrity.
     """
-    if PdfReader is None:
+    # Try importing pypdf, handle case if not installed
+    try:
+        from pypdf import PdfReader
+    except ImportError:
         console.print("[bold red]Error:[/bold red] 'pypdf' is not installed. Please run [bold]pip install pypdf[/bold]")
         raise typer.Exit(code=1)
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.text import Text
+    from .manifest import decode_payload, decompress_manifest, parse_manifest, split_checksum
 
     if not os.path.exists(pdf_path):
         console.print(f"[bold red]Error:[/bold red] File not found: {pdf_path}")
@@ -162,11 +334,7 @@ def run_unpack(
             # 1. Read PDF
             try:
                 reader = PdfReader(pdf_path)
-                full_text = ""
-                for page in reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        full_text += text + "\n"
+                payload, full_text = _scan_pdf_text(reader, keep_text=force_scrape)
             except Exception as e:
                 console.print(f"[bold red]Error reading PDF:[/bold red] {e}")
                 raise typer.Exit(code=1)
@@ -174,36 +342,29 @@ def run_unpack(
             # 2. Attempt Digital Twin Manifest Extraction (The Safe Path)
             progress.update(task, description="Searching for Digital Twin Manifest...")
             
-            manifest_pattern = r"--- VIBECODE_RESTORE_BLOCK_START ---\s*(.*?)\s*--- VIBECODE_RESTORE_BLOCK_END ---"
-            match = re.search(manifest_pattern, full_text, re.DOTALL)
-
             files_restored = 0
             manifest_error = None
             
-            if match:
+            if payload is not None:
                 progress.update(task, description="Manifest found! Restoring with high fidelity...")
-                payload = match.group(1).strip()
                 
                 try:
+                    # Verify the sha256 header written alongside the payload
+                    payload, expected_hash = split_checksum(payload)
+                    if expected_hash:
+                        actual_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+                        if actual_hash != expected_hash:
+                            console.print(f"[yellow]Checksum mismatch![/yellow] Expected {expected_hash[:8]}..., got {actual_hash[:8]}...")
+                    
                     # Decode & Decompress
-                    compressed_data = base64.b64decode(payload)
-                    json_bytes = zlib.decompress(compressed_data)
-                    file_map = json.loads(json_bytes.decode('utf-8'))
+                    compressed_data = decode_payload(payload)
+                    json_bytes = decompress_manifest(compressed_data)
+                    file_map = parse_manifest(json_bytes)
                     
                     # Restore files
-                    for rel_path, content in file_map.items():
-                        # Security check
-                        safe_path = os.path.normpath(rel_path)
-                        if safe_path.startswith("..") or os.path.isabs(safe_path):
-                            console.print(f"[yellow]Skipping unsafe path:[/yellow] {rel_path}")
-                            continue
-
-                        full_out_path = os.path.join(output_dir, safe_path)
-                        os.makedirs(os.path.dirname(full_out_path), exist_ok=True)
-                        
-                        with open(full_out_path, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                        files_restored += 1
+                    files_restored, skipped = _restore_files(file_map, output_dir)
+                    for rel_path in skipped:
+                        console.print(f"[yellow]Skipping unsafe path:[/yellow] {rel_path}")
                         
                     console.print(f"[bold green]✓[/bold green] Restored {files_restored} files via Digital Twin Manifest.")
                     return
@@ -218,28 +379,23 @@ def run_unpack(
         
         if force_scrape:
             # Emergency "Break Glass" Path
-            console.print("")
-            console.print("[bold yellow]" + "=" * 60 + "[/bold yellow]")
-            console.print("[bold yellow]⚠️  WARNING: EMERGENCY VISUAL SCRAPE ACTIVE[/bold yellow]")
-            console.print("[bold yellow]" + "=" * 60 + "[/bold yellow]")
-            console.print("[yellow]You are bypassing Digital Twin integrity checks.[/yellow]")
-            console.print("[yellow]Visual PDF scraping DESTROYS Python whitespace.[/yellow]")
-            console.print("[yellow]The output code may have INVALID INDENTATION/SYNTAX.[/yellow]")
-            console.print("[bold yellow]" + "=" * 60 + "[/bold yellow]")
-            console.print("")
-            
-            # Perform legacy scrape
-            clean_pattern = r"\\"
-            cleaned_text = re.sub(clean_pattern, "", full_text)
+            console.print("\n".join([
+                "",
+                "[bold yellow]" + "=" * 60 + "[/bold yellow]",
+                "[bold yellow]⚠️  WARNING: EMERGENCY VISUAL SCRAPE ACTIVE[/bold yellow]",
+                "[bold yellow]" + "=" * 60 + "[/bold yellow]",
+                "[yellow]You are bypassing Digital Twin integrity checks.[/yellow]",
+                "[yellow]Visual PDF scraping DESTROYS Python whitespace.[/yellow]",
+                "[yellow]The output code may have INVALID INDENTATION/SYNTAX.[/yellow]",
+                "[bold yellow]" + "=" * 60 + "[/bold yellow]",
+                "",
+            ]))
             
-            block_pattern = r"--- START_FILE: (.*?) ---\n(.*?)--- END_FILE ---"
-            matches = re.findall(block_pattern, cleaned_text, re.DOTALL)
-            
-            if not matches:
-                console.print("[bold red]✗ No files found via text scraping either.[/bold red]")
-                raise typer.Exit(code=1)
-                
-            for filename, content in matches:
+            # Perform legacy scrape (per-file status is buffered and printed once)
+            report = Text()
+            blocks_found = 0
+            for filename, content in _iter_scraped_blocks(full_text):
+                blocks_found += 1
                 filename = filename.strip()
                 if len(filename) > 200 or "\n" in filename: 
                     continue
@@ -251,28 +407,41 @@ def run_unpack(
                     with open(full_out_path, 'w', encoding='utf-8') as f:
                         f.write(content.strip())
                     files_restored += 1
-                    console.print(f"  [yellow]⚠ Scraped: {filename}[/yellow]")
+                    if verbose:
+                        report.append(f"  ⚠ Scraped: {filename}\n", style="yellow")
                 except Exception as e:
-                    console.print(f"  [red]Failed to save {filename}: {e}[/red]")
+                    report.append(f"  Failed to save {filename}: {e}\n", style="red")
+
+            if report:
+                report.rstrip()
+                console.print(report)
+
+            if not blocks_found:
+                console.print("[bold red]✗ No files found via text scraping either.[/bold red]")
+                raise typer.Exit(code=1)
 
-            console.print(f"\n[bold yellow]⚠️ Emergency Extraction Complete:[/bold yellow] {files_restored} files recovered (LOSSY).")
-            console.print("[dim]Please manually verify indentation before using this code.[/dim]")
+            console.print(
+                f"\n[bold yellow]⚠️ Emergency Extraction Complete:[/bold yellow] {files_restored} files recovered (LOSSY).\n"
+                "[dim]Please manually verify indentation before using this code.[/dim]"
+            )
         else:
             # Safe Abort (Protect User from Silent Corruption)
-            console.print("")
-            console.print("[bold red]" + "=" * 60 + "[/bold red]")
-            console.print("[bold red][!] RESTORATION ABORTED to protect codebase integrity.[/bold red]")
-            console.print("[bold red]" + "=" * 60 + "[/bold red]")
-            console.print("")
-            console.print("The Digital Twin manifest is missing or corrupted.")
-            console.print("Automatic fallback to text scraping has been DISABLED")
-            console.print("because it produces syntactically invalid Python code.")
-            console.print("")
-            console.print("If you understand the risks and need partial recovery,")
-            console.print("run again with the emergency flag:")
-            console.print("")
-            console.print(f"    [bold]vibecode unpack \"{pdf_path}\" --force-scrape[/bold]")
-            console.print("")
+            console.print("\n".join([
+                "",
+                "[bold red]" + "=" * 60 + "[/bold red]",
+                "[bold red][!] RESTORATION ABORTED to protect codebase integrity.[/bold red]",
+                "[bold red]" + "=" * 60 + "[/bold red]",
+                "",
+                "The Digital Twin manifest is missing or corrupted.",
+                "Automatic fallback to text scraping has been DISABLED",
+                "because it produces syntactically invalid Python code.",
+                "",
+                "If you understand the risks and need partial recovery,",
+                "run again with the emergency flag:",
+                "",
+                f"    [bold]vibecode unpack \"{pdf_path}\" --force-scrape[/bold]",
+                "",
+            ]))
             raise typer.Exit(code=1)
 
     except typer.Exit:
@@ -289,6 +458,7 @@ def launch_gui():
     """
     console.print("[bold cyan]Launching GUI...[/bold cyan]")
     try:
+        from .gui import run_gui
         run_gui()
     except Exception as e:
         console.print(f"[bold red]✗ Error launching GUI:[/bold red] {e}")
@@ -319,6 +489,8 @@ def run_server(
     - list_files: List directory contents
     - get_project_summary: Get project statistics
     """
+    from rich.panel import Panel
+    
     console.print(
         Panel.fit(
             f"[bold green]🚀 Starting Vibecode MCP Server[/bold green]\n"
@@ -1,10 +1,13 @@
 """
 Configuration management for VibeCode.
 """
+import os
 import yaml
-from pydantic import BaseModel, Field, ValidationError
-from typing import List, Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from typing import List, Dict, Optional, Tuple
 
+# libyaml's C loader when PyYAML was built with it; same safe subset, much faster
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 # --- AI MODEL CONFIGURATION (ECR #005) ---
 
@@ -84,6 +87,8 @@ def get_active_model_id(user_settings: Optional[Dict] = None) -> str:
 
 class OutputConfig(BaseModel):
     """Configuration for output file settings."""
+    model_config = ConfigDict(frozen=True)
+    
     human_pdf: str = "snapshot_human.pdf"
     llm_pdf: str = "snapshot_llm.pdf"
     pygments_style: str = "monokai"
@@ -93,7 +98,10 @@ class ProjectConfig(BaseModel):
     """
     Main project configuration model.
     Validates and provides defaults for all .vibecode.yaml settings.
+    Frozen, because load_config hands the same cached instance to every caller.
     """
+    model_config = ConfigDict(frozen=True)
+    
     project_name: str = "Unnamed Project"
     files: List[str] = Field(default_factory=list)
     autodiscover_py: bool = False
@@ -111,23 +119,37 @@ class ProjectConfig(BaseModel):
     version: float = 1.0
 
 
+# Parsed configs keyed by absolute path: (mtime_ns, size, config)
+_CONFIG_CACHE: Dict[str, Tuple[int, int, ProjectConfig]] = {}
+
+
 def load_config(config_path: str) -> ProjectConfig:
     """
     Loads and validates the .vibecode.yaml file.
-    Uses yaml.safe_load() to prevent RCE.
+    Uses the safe YAML loader (C-accelerated when available) to prevent RCE.
     Pydantic provides automatic type coercion and clear error messages.
+    Results are cached until the file's mtime or size changes.
     """
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            # Use safe_load() for security
-            data = yaml.safe_load(f)
+        abs_path = os.path.abspath(config_path)
+        st = os.stat(abs_path)
+        cached = _CONFIG_CACHE.get(abs_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        
+        with open(abs_path, 'r', encoding='utf-8') as f:
+            # Safe loader only, for security
+            data = yaml.load(f, Loader=SafeLoader)
             
             # Handle empty file
             if data is None:
                 data = {}
             
             # Pydantic validates and provides defaults
-            return ProjectConfig.model_validate(data)
+            config = ProjectConfig.model_validate(data)
+        
+        _CONFIG_CACHE[abs_path] = (st.st_mtime_ns, st.st_size, config)
+        return config
 
     except FileNotFoundError:
         raise FileNotFoundError(f"Config file not found at {config_path}")
@@ -2,91 +2,180 @@
 File discovery and gitignore handling.
 """
 import os
+import re
 import logging
+import functools
 from pathlib import Path
 import pathspec
 from pathspec.patterns import GitWildMatchPattern
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# .gitignore lines keyed by resolved project root: ((mtime_ns, size), lines)
+_GITIGNORE_CACHE: Dict[str, Tuple[Tuple[int, int], Tuple[str, ...]]] = {}
+
+
+def read_gitignore_lines(project_root: str) -> Tuple[str, ...]:
+    """
+    Returns the raw lines of the project's .gitignore (empty if it is missing
+    or unreadable). Cached until the file's mtime or size changes.
+    """
+    root = str(Path(project_root).resolve())
+    gitignore_path = os.path.join(root, '.gitignore')
+    try:
+        st = os.stat(gitignore_path)
+    except OSError:
+        _GITIGNORE_CACHE.pop(root, None)
+        return ()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _GITIGNORE_CACHE.get(root)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    
+    try:
+        with open(gitignore_path, 'r', encoding='utf-8') as f:
+            lines = tuple(f.readlines())
+    except Exception as e:
+        logger.warning(f"Could not read .gitignore: {e}")
+        return ()
+    _GITIGNORE_CACHE[root] = (stamp, lines)
+    return lines
+
+
 def load_gitignore_spec(project_root: str) -> pathspec.PathSpec:
     """
     Loads .gitignore rules from the project root.
     Returns a PathSpec object for matching.
+    Results are cached until .gitignore changes (or appears/disappears).
     """
-    root = Path(project_root)
-    gitignore_path = root / '.gitignore'
-    patterns = []
-
     # 1. Load .gitignore if it exists
-    if gitignore_path.exists():
-        try:
-            with open(gitignore_path, 'r', encoding='utf-8') as f:
-                patterns.extend(f.readlines())
-        except Exception as e:
-            logger.warning(f"Could not read .gitignore: {e}")
-
     # 2. Always add default patterns for Version Control Systems
     # This prevents the tool from accidentally scanning its own .git folder
-    patterns.append('.git/')
+    return build_spec(read_gitignore_lines(project_root) + ('.git/',))
+
+@functools.lru_cache(maxsize=32)
+def _spec_from_lines(lines: Tuple[str, ...]) -> pathspec.PathSpec:
+    return pathspec.PathSpec.from_lines(GitWildMatchPattern, lines)
+
+def build_spec(lines) -> pathspec.PathSpec:
+    """
+    Returns a gitwildmatch PathSpec for the given pattern lines.
+    Specs are memoized by their lines, so re-running a scan with the same
+    rules reuses the compiled patterns. The returned spec is shared and
+    must not be modified.
+    """
+    return _spec_from_lines(tuple(lines))
+
+# A plain name, optionally with a trailing slash: `node_modules`, `.venv/`
+_BARE_NAME_RE = re.compile(r"[^/*?\[\]\\!#\s]+/?")
+
+def _ignored_dir_names(spec: pathspec.PathSpec) -> frozenset:
+    """
+    Directory basenames the spec ignores at any depth.
+    
+    Bare-name patterns (`node_modules/`, `.venv`) match a directory of that
+    name anywhere in the tree, so the walker can prune it with a set lookup
+    before building its relative path. Negation patterns may re-include
+    such directories, so specs containing them get no fast path.
+    """
+    names = set()
+    for pattern in spec.patterns:
+        if pattern.include is False:
+            return frozenset()
+        source = getattr(pattern, 'pattern', None)
+        if pattern.include and isinstance(source, str):
+            source = source.rstrip('\r\n')
+            if _BARE_NAME_RE.fullmatch(source):
+                names.add(source.rstrip('/'))
+    return frozenset(names)
+
+def compile_matcher(spec: pathspec.PathSpec) -> Callable[[str], bool]:
+    """
+    Returns a fast `match(posix_path) -> bool` equivalent to spec.match_file.
+    
+    All include patterns are folded into one alternation regex, so each path
+    costs a single regex match instead of one per pattern. Specs containing
+    negation ('!') patterns depend on last-match-wins ordering, so those
+    keep using spec.match_file. Paths must already be POSIX and relative.
+    """
+    sources = []
+    for pattern in spec.patterns:
+        if pattern.include is None:  # Blank lines and comments
+            continue
+        regex = getattr(pattern, 'regex', None)
+        if pattern.include is False or regex is None:
+            return spec.match_file
+        # Named groups may not repeat across alternatives
+        sources.append(re.sub(r"\(\?P<\w+>", "(?:", regex.pattern))
     
-    return pathspec.PathSpec.from_lines(GitWildMatchPattern, patterns)
+    if not sources:
+        return lambda path: False
+    combined = re.compile("|".join(f"(?:{source})" for source in sources))
+    return lambda path: combined.match(path) is not None
 
-def discover_files(project_root: str, spec: pathspec.PathSpec) -> List[str]:
+def discover_files(project_root: str, spec: pathspec.PathSpec,
+                   extensions: Optional[Tuple[str, ...]] = None) -> List[str]:
     """
     Walks the project_root, respects the .gitignore spec,
     and returns a list of non-ignored ABSOLUTE file paths.
+    
+    When `extensions` is given, only files whose name ends with one of them
+    are returned. The suffix test runs on DirEntry.name during the walk,
+    before any ignore matching, so filtered-out files cost no extra work.
+    Matching is case-sensitive, like str.endswith.
     """
-    root_path = Path(project_root).resolve()
+    root_path = str(Path(project_root).resolve())
     discovered_files = []
+    is_ignored = compile_matcher(spec)
+    pruned_names = _ignored_dir_names(spec)
+    if extensions is not None:
+        # Single-dot suffixes (`.py`) are a set lookup on the name's last suffix;
+        # compound (`.d.ts`) or dotless entries still go through endswith()
+        simple_exts = frozenset(e for e in extensions if e.startswith('.') and e.count('.') == 1)
+        other_exts = tuple(e for e in extensions if e not in simple_exts)
 
-    def on_walk_error(error: OSError):
-        """Callback for os.walk errors (permission denied, etc.)"""
-        logger.warning(f"Cannot access directory: {error.filename} - {error.strerror}")
-
-    # We use os.walk() instead of Path.rglob() because os.walk allow us to 
-    # modify 'dirs' in-place. This lets us efficiently PRUNE massive ignored 
-    # directories (like node_modules or venv) effectively skipping them entirely.
-    for current_root, dirs, files in os.walk(root_path, onerror=on_walk_error):
-        current_root_path = Path(current_root)
-        
-        # Calculate relative path from project root for matching against spec
+    # Explicit os.scandir() DFS rather than os.walk(): the DirEntry type
+    # information is reused for classification, ignored directories (like
+    # node_modules or venv) are PRUNED before they are ever opened, and each
+    # stack frame carries its relative POSIX prefix for matching against spec.
+    # Visit order matches os.walk (top-down, directory entries in listing order).
+    stack = [(root_path, '')]
+    while stack:
+        current_root, rel_prefix = stack.pop()
         try:
-            rel_path_obj = current_root_path.relative_to(root_path)
-        except ValueError as e:
-            logger.warning(f"Skipping directory with unexpected path: {current_root} - {e}")
+            with os.scandir(current_root) as it:
+                entries = list(it)
+        except OSError as error:
+            logger.warning(f"Cannot access directory: {error.filename} - {error.strerror}")
             continue
         
-        # 1. Prune Directories (Optimization)
-        # We iterate over a copy (list(dirs)) so we can modify the original 'dirs' list safely.
-        for d in list(dirs):
+        subdirs = []
+        for entry in entries:
+            name = entry.name
             try:
-                dir_rel_path = rel_path_obj / d
-                
-                # pathspec directory matching often requires a trailing slash 
-                # to distinguish "temp" (file) from "temp/" (dir)
-                # .as_posix() ensures we use '/' even on Windows
-                check_path = f"{dir_rel_path.as_posix()}/"
-                
-                if spec.match_file(check_path):
-                    dirs.remove(d)  # This stops os.walk from entering this directory
-            except Exception as e:
-                logger.warning(f"Error processing directory '{d}': {e}")
-                dirs.remove(d)  # Skip problematic directories
-
-        # 2. Collect Files
-        for f in files:
-            try:
-                file_rel_path = rel_path_obj / f
-                
-                # Check if file is ignored
-                if not spec.match_file(file_rel_path.as_posix()):
+                # Symlinked directories are listed but not entered (as os.walk)
+                if entry.is_dir():
+                    # 1. Prune Directories (Optimization)
+                    # pathspec directory matching often requires a trailing slash 
+                    # to distinguish "temp" (file) from "temp/" (dir)
+                    if name in pruned_names or entry.is_symlink():
+                        continue
+                    if not is_ignored(f"{rel_prefix}{name}/"):
+                        subdirs.append((entry.path, f"{rel_prefix}{name}/"))
+                # 2. Collect Files
+                elif extensions is not None and not (
+                        name[name.rfind('.'):] in simple_exts
+                        or (other_exts and name.endswith(other_exts))):
+                    continue
+                elif not is_ignored(rel_prefix + name):
                     # Store absolute path for the engine to read later
-                    full_path = current_root_path / f
-                    discovered_files.append(str(full_path))
+                    discovered_files.append(entry.path)
             except Exception as e:
-                logger.warning(f"Skipping file '{f}' in '{current_root}': {e}")
+                logger.warning(f"Skipping '{name}' in '{current_root}': {e}")
+        
+        # Reversed so the first subdirectory is visited next
+        stack.extend(reversed(subdirs))
 
     logger.debug(f"Discovered {len(discovered_files)} files in {project_root}")
     return discovered_files
\ No newline at end of file
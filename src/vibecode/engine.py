@@ -1,15 +1,82 @@
 from .config import ProjectConfig, load_config, OutputConfig
-from .discovery import discover_files, load_gitignore_spec
+from .discovery import compile_matcher, discover_files, load_gitignore_spec
 from .renderers import human, llm, markdown
 from typing import List, Tuple, Optional
 import os
 import sys
+import site
+import logging
 import subprocess
 import platform
+import json
 import datetime
+import itertools
+from importlib import metadata
+from concurrent.futures import ThreadPoolExecutor
 import pathspec  # <-- MODIFICATION: Import pathspec
 from pathspec.patterns import GitWildMatchPattern # <-- MODIFICATION
 
+logger = logging.getLogger(__name__)
+
+# File reads are I/O-bound (the GIL is released during read), so overlap them
+READ_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+
+# Files larger than this are replaced by a stub instead of being read
+MAX_FILE_BYTES = 2 * 1024 * 1024
+
+# Captured dependency lists keyed by (interpreter, site-packages mtimes)
+_env_cache: dict = {}
+
+
+def _environment_key() -> tuple:
+    """Cache key that changes when packages are installed or removed."""
+    try:
+        site_dirs = list(site.getsitepackages())
+    except AttributeError:  # Some virtualenv builds lack getsitepackages()
+        site_dirs = []
+    if site.ENABLE_USER_SITE and site.USER_SITE:
+        site_dirs.append(site.USER_SITE)
+    
+    mtimes = []
+    for directory in site_dirs:
+        try:
+            mtimes.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return (sys.executable, tuple(site_dirs), tuple(mtimes))
+
+
+# Packaging tools that `pip freeze` leaves out by default
+_FREEZE_SKIP = {"pip", "setuptools", "wheel", "distribute"}
+
+
+def _freeze_installed_packages() -> str:
+    """
+    List installed distributions in `pip freeze` format, in-process.
+    
+    Reads importlib.metadata instead of spawning pip. Editable installs
+    are written as `-e <url>` and other direct-URL installs as
+    `name @ <url>`, as pip does.
+    """
+    lines = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if not name or name.lower() in _FREEZE_SKIP or name.lower() in lines:
+            continue  # First distribution on sys.path wins, as in pip
+        
+        line = f"{name}=={dist.version}"
+        direct_url = dist.read_text("direct_url.json")
+        if direct_url:
+            info = json.loads(direct_url)
+            if info.get("dir_info", {}).get("editable"):
+                line = f"-e {info['url']}"
+            elif "url" in info and "archive_info" not in info:
+                line = f"{name} @ {info['url']}"
+        lines[name.lower()] = line
+    
+    return "".join(f"{lines[key]}\n" for key in sorted(lines))
+
+
 class ProjectEngine:
     """
     Core engine for VibeCode projects.
@@ -26,6 +93,7 @@ class ProjectEngine:
         self.exclude_spec = pathspec.PathSpec.from_lines(
             GitWildMatchPattern, self.config.exclude
         )
+        self._is_excluded = compile_matcher(self.exclude_spec)
         # --- END MODIFICATION ---
 
     def gather_files(self) -> List[Tuple[str, str]]:
@@ -44,8 +112,6 @@ class ProjectEngine:
         discovered_files = []
         # --- MODIFICATION: Check for autodiscover_py OR autodiscover_ext ---
         if self.config.autodiscover_py or self.config.autodiscover_ext:
-            all_files = discover_files(self.project_root, self.gitignore_spec)
-            
             # Build the list of extensions to check
             extensions_to_check = list(self.config.autodiscover_ext)
             if self.config.autodiscover_py:
@@ -54,39 +120,67 @@ class ProjectEngine:
             extensions = tuple(extensions_to_check)
             # --- END MODIFICATION ---
 
-            for f in all_files:
-                if f.endswith(extensions):
-                    discovered_files.append(f)
+            # The walk applies the extension filter itself
+            discovered_files = discover_files(
+                self.project_root, self.gitignore_spec, extensions=extensions
+            )
                     
         # 3. Combine and de-duplicate (preserving order)
+        # dict.fromkeys dedups the normalized paths in one ordered C-level pass;
+        # the relative POSIX path is computed once per survivor and reused.
+        unique_files = dict.fromkeys(
+            os.path.normpath(f) for f in itertools.chain(explicit_files, discovered_files)
+        )
         final_file_list = []
-        seen = set()
-        for f in explicit_files + discovered_files:
-            f = os.path.normpath(f)
-            if f not in seen and os.path.isfile(f):
-                # --- MODIFICATION: Use pathspec for exclude logic ---
-                rel_path = os.path.relpath(f, self.project_root)
-                rel_path_posix = rel_path.replace(os.path.sep, '/')
-                
-                # Check if the file is NOT matched by the 'exclude' spec
-                if not self.exclude_spec.match_file(rel_path_posix):
-                    seen.add(f)
-                    final_file_list.append(f)
-                # --- END MODIFICATION ---
-
-        # 4. Read content
-        file_contents = []
-        for path in final_file_list:
+        for path in unique_files:
+            if not os.path.isfile(path):
+                continue
+            
+            # --- MODIFICATION: Use pathspec for exclude logic ---
             rel_path = os.path.relpath(path, self.project_root).replace(os.path.sep, '/')
+            
+            # Check if the file is NOT matched by the 'exclude' spec
+            if not self._is_excluded(rel_path):
+                final_file_list.append((path, rel_path))
+            # --- END MODIFICATION ---
+
+        # 4. Read content (in parallel; map() keeps the list order)
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+            return list(pool.map(self._read_file, final_file_list))
+
+    def _read_file(self, item: Tuple[str, str]) -> Tuple[str, str]:
+        """
+        Read one gathered (path, relative_path) item, returning its
+        (relative_path, content) tuple.
+        
+        The size from a single stat() guards against oversized files and
+        lets the content be read with one os.read() call.
+        """
+        path, rel_path = item
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                file_contents.append((rel_path, content))
-            except Exception:
-                # Fail gracefully on unreadable files
-                file_contents.append((rel_path, f"Error: Could not read file"))
-                
-        return file_contents
+                size = os.fstat(fd).st_size
+                if size > MAX_FILE_BYTES:
+                    return rel_path, f"# [vibecode] file skipped: {size} bytes > limit"
+                chunks = []
+                while True:
+                    chunk = os.read(fd, max(size, 1))
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+            finally:
+                os.close(fd)
+            
+            # Invalid bytes become U+FFFD so mixed-encoding files keep their content
+            content = b"".join(chunks).decode('utf-8', errors='replace')
+            # Same newline handling as text-mode open()
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+            return rel_path, content
+        except Exception:
+            # Fail gracefully on unreadable files
+            return rel_path, "Error: Could not read file"
 
     def _capture_runtime_environment(self) -> str:
         """
@@ -106,8 +200,19 @@ class ProjectEngine:
             ""
         ]
 
-        # 2. Dependency Capture (The "pip freeze")
-        dependencies = ""
+        # 2. Dependency Capture (The "pip freeze"), cached until site-packages changes
+        env_key = _environment_key()
+        dependencies = _env_cache.get(env_key)
+        if dependencies is not None:
+            return "\n".join(header) + dependencies
+        
+        try:
+            dependencies = _freeze_installed_packages()
+            _env_cache[env_key] = dependencies
+            return "\n".join(header) + dependencies
+        except Exception as e:
+            logger.debug(f"In-process dependency listing failed, falling back to pip: {e}")
+        
         try:
             # Use sys.executable to ensure we use the CURRENT environment's pip
             result = subprocess.run(
@@ -118,6 +223,7 @@ class ProjectEngine:
             )
             if result.returncode == 0:
                 dependencies = result.stdout
+                _env_cache[env_key] = dependencies
             else:
                 dependencies = f"# Error capturing dependencies: {result.stderr}"
         except subprocess.TimeoutExpired:
@@ -3,22 +3,41 @@ Dialog windows for the VibeCode GUI.
 Includes configuration, scanning, diff viewing, and export dialogs.
 """
 import os
-import hashlib
-import pathspec
-from pathspec.patterns import GitWildMatchPattern
+import sys
+import html
+import json
+import shutil
+import functools
+import itertools
+import tempfile
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGroupBox, 
                              QPushButton, QScrollArea, QWidget, QGridLayout, 
                              QCheckBox, QLineEdit, QDialogButtonBox, QLabel, 
                              QComboBox, QPlainTextEdit, QTextEdit, QMessageBox, QListWidget,
-                             QListWidgetItem, QProgressBar, QApplication, QSplitter, QFileDialog, QFrame)
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QColor, QPalette
+                             QListWidgetItem, QProgressBar, QApplication, QSplitter, QFileDialog, QFrame,
+                             QFormLayout)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import (QColor, QPalette, QSyntaxHighlighter, QTextCharFormat, QTextCursor,
+                         QTextDocument)
 
-from ..discovery import discover_files
-from ..engine import ProjectEngine
-from .utils import DEFAULT_EXTENSIONS, EXTENSION_PRESETS
-from .workers import RestorationWorker
+from ..config import KNOWN_MODELS, CUSTOM_PROVIDER_PRESETS
+from ..discovery import build_spec, discover_files, read_gitignore_lines
+from ..settings import get_settings
+from .utils import (DEFAULT_EXTENSIONS, EXTENSION_PRESETS, LEGACY_SNAPSHOT_HASH,
+                    cache_file_name, hash_file)
+from .workers import (BatchExportWorker, ChangeDetectionWorker, ConnectionTestWorker,
+                      RestorationWorker)
+
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OpenAI = None
+    OPENAI_AVAILABLE = False
 
 # --- EXTENSION MANAGER DIALOG ---
 class ExtensionManagerDialog(QDialog):
@@ -38,7 +57,7 @@ class ExtensionManagerDialog(QDialog):
         preset_layout = QHBoxLayout()
         for preset_name in EXTENSION_PRESETS:
             btn = QPushButton(preset_name)
-            btn.clicked.connect(lambda checked, name=preset_name: self.apply_preset(name))
+            btn.clicked.connect(functools.partial(self.apply_preset, preset_name))
             preset_layout.addWidget(btn)
         btn_all = QPushButton("All")
         btn_all.setStyleSheet("background-color: #2E8B57;")
@@ -89,17 +108,36 @@ class ExtensionManagerDialog(QDialog):
         layout.addWidget(btn_box)
     
     def _populate_extension_grid(self):
-        for i in reversed(range(self.ext_grid.count())):
-            self.ext_grid.itemAt(i).widget().setParent(None)
-        self.checkboxes.clear()
+        # Incremental sync: existing checkboxes are kept and only re-placed in the
+        # grid; widgets are created for new extensions and destroyed for dropped ones
         all_exts = sorted(set(DEFAULT_EXTENSIONS) | self.extensions)
+        grid_widget = self.ext_grid.parentWidget()
+        grid_widget.setUpdatesEnabled(False)  # One relayout/repaint for the whole sync
+        try:
+            self._sync_extension_grid(all_exts)
+        finally:
+            grid_widget.setUpdatesEnabled(True)
+
+    def _sync_extension_grid(self, all_exts):
+        wanted = set(all_exts)
+        for ext in [e for e in self.checkboxes if e not in wanted]:
+            cb = self.checkboxes.pop(ext)
+            self.ext_grid.removeWidget(cb)
+            cb.setParent(None)
+        
         cols = 5
         for i, ext in enumerate(all_exts):
-            cb = QCheckBox(ext)
-            cb.setChecked(ext in self.extensions)
-            cb.stateChanged.connect(lambda state, e=ext: self._toggle_ext(e, state))
-            self.checkboxes[ext] = cb
+            cb = self.checkboxes.get(ext)
             row, col = divmod(i, cols)
+            if cb is None:
+                cb = QCheckBox(ext)
+                cb.setChecked(ext in self.extensions)
+                cb.stateChanged.connect(functools.partial(self._toggle_ext, ext))
+                self.checkboxes[ext] = cb
+            else:
+                if self.ext_grid.getItemPosition(self.ext_grid.indexOf(cb))[:2] == (row, col):
+                    continue
+                self.ext_grid.removeWidget(cb)
             self.ext_grid.addWidget(cb, row, col)
     
     def _toggle_ext(self, ext, state):
@@ -251,22 +289,19 @@ class ScanDialog(QDialog):
         customs = [line.strip() for line in raw_custom if line.strip()]
         full_exclude_list = active_defaults + customs
         
-        patterns = []
-        gitignore_path = os.path.join(self.project_root, '.gitignore')
-        if os.path.exists(gitignore_path):
-            try:
-                with open(gitignore_path, 'r') as f: patterns.extend(f.readlines())
-            except: pass
+        # .gitignore lines are cached until the file changes; the compiled spec
+        # is memoized by its lines, so re-running an unchanged scan reuses both
+        patterns = list(read_gitignore_lines(self.project_root))
         patterns.extend(full_exclude_list)
         
-        spec = pathspec.PathSpec.from_lines(GitWildMatchPattern, patterns)
+        spec = build_spec(patterns)
 
         try:
-            all_files = discover_files(scan_root, spec)
+            # Extension filtering happens inside the walk (one traversal)
             relevant_exts = tuple(self.included_extensions)
             found = []
-            for f in all_files:
-                if f.endswith(relevant_exts) and '.vibecode.yaml' not in f:
+            for f in discover_files(scan_root, spec, extensions=relevant_exts):
+                if '.vibecode.yaml' not in f:
                     rel = os.path.relpath(f, self.project_root).replace(os.path.sep, '/')
                     found.append(rel)
             
@@ -278,15 +313,78 @@ class ScanDialog(QDialog):
 
 
 # --- DIFF VIEW DIALOG ---
+HASH_INDEX_NAME = 'hash_index.json'
+
+# Selection must settle this long before a diff is computed
+DIFF_DEBOUNCE_MS = 120
+# Diff lines inserted per event-loop turn, so long diffs render progressively
+DIFF_BATCH_LINES = 500
+# Above this size (either side), diff with `git diff --no-index` instead of difflib
+GIT_DIFF_THRESHOLD = 1024 * 1024
+
+# Per-project hash index: project_root -> {rel_path: [mtime_ns, size, algorithm, digest]}.
+# Loaded lazily from .vibecode/cache/hash_index.json, written back when a diff dialog closes.
+_HASH_CACHE = {}
+
+
+def _hash_index_path(project_root):
+    return os.path.join(project_root, '.vibecode', 'cache', HASH_INDEX_NAME)
+
+
+def _load_hash_index(project_root):
+    index = _HASH_CACHE.get(project_root)
+    if index is None:
+        try:
+            with open(_hash_index_path(project_root), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if not isinstance(index, dict):
+                index = {}
+        except (OSError, ValueError):
+            index = {}
+        _HASH_CACHE[project_root] = index
+    return index
+
+
+def _save_hash_index(project_root):
+    """Atomically write the project's hash index (write temp file, then rename)."""
+    index = _HASH_CACHE.get(project_root)
+    if index is None:
+        return
+    path = _hash_index_path(project_root)
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
 class DiffViewDialog(QDialog):
     """Shows changes in project files since last generation."""
     
-    def __init__(self, project_root, current_files, last_snapshot, parent=None):
+    def __init__(self, project_root, current_files, last_snapshot, parent=None,
+                 snapshot_hash=LEGACY_SNAPSHOT_HASH):
         super().__init__(parent)
         self.setWindowTitle("Changes Since Last Generation")
         self.resize(1000, 700)
         self.project_root = project_root
         self.last_snapshot = last_snapshot
+        # Digests are recomputed with the algorithm the snapshot was saved with
+        self.snapshot_hash = snapshot_hash
+        self._hash_index = _load_hash_index(project_root)
+        self._hash_index_dirty = False
+        # Bumped on every selection change; stale batch renders stop early
+        self._diff_generation = 0
+        self._rendered_key = None
+        self._pending_item = None
+        self._diff_timer = QTimer(self)
+        self._diff_timer.setSingleShot(True)
+        self._diff_timer.setInterval(DIFF_DEBOUNCE_MS)
+        self._diff_timer.timeout.connect(self._run_pending_diff)
+        # Reads the cached original while the GUI thread reads the current file
+        self._read_pool = ThreadPoolExecutor(max_workers=1)
         
         main_layout = QVBoxLayout(self)
         
@@ -300,52 +398,46 @@ class DiffViewDialog(QDialog):
         left_layout.setContentsMargins(0, 0, 5, 0)
         
         # Calculate diff
+        # The snapshot's keys view takes part in the set algebra directly,
+        # so no copy of the snapshot keys is built
         current_set = set(current_files)
-        last_set = set(last_snapshot.keys()) if last_snapshot else set()
+        last_keys = last_snapshot.keys() if last_snapshot else frozenset()
         
-        added = sorted(list(current_set - last_set))
-        removed = sorted(list(last_set - current_set))
-        
-        # Check for modified files (hash changed)
-        modified = []
-        for f in current_set & last_set:
-            file_path = os.path.join(project_root, f)
-            if os.path.exists(file_path):
-                current_hash = self._hash_file(file_path)
-                if current_hash != last_snapshot.get(f, ''):
-                    modified.append(f)
-        modified.sort()
+        added = sorted(current_set - last_keys)
+        removed = sorted(last_keys - current_set)
+        self._counts = {'added': len(added), 'removed': len(removed)}
         
-        # Summary Label
-        summary = QLabel(f"📊 +{len(added)} | -{len(removed)} | ~{len(modified)}")
-        summary.setStyleSheet("font-weight: bold; font-size: 11pt;")
-        left_layout.addWidget(summary)
+        # Summary Label (modified count arrives from the hashing worker)
+        self.summary = QLabel(f"📊 +{len(added)} | -{len(removed)} | ~…")
+        self.summary.setStyleSheet("font-weight: bold; font-size: 11pt;")
+        left_layout.addWidget(self.summary)
         
         # Tree/List of changes
+        # Uniform heights + batched layout keep large changesets responsive
         self.change_list = QListWidget()
+        self.change_list.setUniformItemSizes(True)
+        self.change_list.setLayoutMode(QListWidget.LayoutMode.Batched)
         left_layout.addWidget(self.change_list)
         
+        # Theme-dependent styling, resolved once per dialog
+        self._dark = dark = self._is_dark()
+        # (prefix, color) per change status
+        self._status_style = {
+            'modified': ("✏️", QColor("#F1C40F" if dark else "#B7950B")),
+            'added': ("➕", QColor("#2ECC71" if dark else "#229954")),
+            'removed': ("➖", QColor("#E74C3C" if dark else "#A93226")),
+        }
+        # Diff line formats, dispatched on the line's first character
+        self._header_fmt = self._line_format("#888888") # Grey
+        self._ctx_fmt = self._line_format("#FFFFFF" if dark else "black")
+        self._line_formats = {
+            '@': self._line_format("#3498DB"), # Blue
+            '+': self._line_format("#2ECC71" if dark else "green"),
+            '-': self._line_format("#E74C3C" if dark else "red"),
+        }
+        
         # Populate list
-        for f in modified:
-            item = QListWidgetItem(f"✏️ {f}")
-            item.setData(Qt.ItemDataRole.UserRole, ('modified', f))
-            item.setForeground(QColor("#F1C40F" if self._is_dark() else "#B7950B"))
-            self.change_list.addItem(item)
-            
-        for f in added:
-            item = QListWidgetItem(f"➕ {f}")
-            item.setData(Qt.ItemDataRole.UserRole, ('added', f))
-            item.setForeground(QColor("#2ECC71" if self._is_dark() else "#229954"))
-            self.change_list.addItem(item)
-            
-        for f in removed:
-            item = QListWidgetItem(f"➖ {f}")
-            item.setData(Qt.ItemDataRole.UserRole, ('removed', f))
-            item.setForeground(QColor("#E74C3C" if self._is_dark() else "#A93226"))
-            self.change_list.addItem(item)
-            
-        if self.change_list.count() == 0:
-            self.change_list.addItem("No changes detected.")
+        self._insert_changes(0, [('added', f) for f in added] + [('removed', f) for f in removed])
             
         self.change_list.currentItemChanged.connect(self.show_diff)
         
@@ -356,10 +448,11 @@ class DiffViewDialog(QDialog):
         right_layout = QVBoxLayout(right_widget)
         right_layout.setContentsMargins(5, 0, 0, 0)
         
-        self.diff_viewer = QTextEdit()
+        # Plain text + char formats: no HTML to build or parse per line
+        self.diff_viewer = QPlainTextEdit()
         self.diff_viewer.setReadOnly(True)
         self.diff_viewer.setStyleSheet("font-family: Consolas, 'Courier New', monospace; font-size: 10pt;")
-        self.diff_viewer.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+        self.diff_viewer.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
         right_layout.addWidget(QLabel("Unified Diff:"))
         right_layout.addWidget(self.diff_viewer)
         
@@ -371,15 +464,89 @@ class DiffViewDialog(QDialog):
         btn_close.clicked.connect(self.accept)
         main_layout.addWidget(btn_close)
         
-        # Select first item if any
-        if self.change_list.count() > 0:
+        # Check for modified files (hash changed) in the background
+        self.change_worker = ChangeDetectionWorker(
+            project_root, list(current_set & last_keys), last_snapshot, self._hash_file
+        )
+        self.change_worker.finished_success.connect(self._on_modified_ready)
+        self.change_worker.finished_error.connect(self._on_modified_error)
+        self.change_worker.start()
+
+    def _on_modified_ready(self, modified):
+        """Insert modified files above added/removed ones once hashing finishes."""
+        self.summary.setText(
+            f"📊 +{self._counts['added']} | -{self._counts['removed']} | ~{len(modified)}"
+        )
+        
+        self._insert_changes(0, [('modified', f) for f in modified])
+            
+        if self.change_list.count() == 0:
+            self.change_list.addItem("No changes detected.")
+            
+        # Select first item if any (unless the user already picked one)
+        if self.change_list.currentItem() is None and self.change_list.count() > 0:
             self.change_list.setCurrentRow(0)
 
+    def _on_modified_error(self, error):
+        """Report that modified files could not be determined (rather than 'none')."""
+        self.summary.setText(f"📊 +{self._counts['added']} | -{self._counts['removed']} | ~?")
+        self.summary.setToolTip(error)
+        QMessageBox.warning(self, "Change Detection Failed",
+                            f"Could not check files for modifications:\n{error}")
+
+    def _insert_changes(self, row, changes):
+        """Insert (status, rel_path) entries at `row` with repaints and signals suspended."""
+        self.change_list.setUpdatesEnabled(False)
+        self.change_list.blockSignals(True)
+        try:
+            for offset, (status, rel_path) in enumerate(changes):
+                prefix, color = self._status_style[status]
+                item = QListWidgetItem(f"{prefix} {rel_path}")
+                item.setData(Qt.ItemDataRole.UserRole, (status, rel_path))
+                item.setForeground(color)
+                self.change_list.insertItem(row + offset, item)
+        finally:
+            self.change_list.blockSignals(False)
+            self.change_list.setUpdatesEnabled(True)
+
+    def done(self, result):
+        # Don't destroy the dialog while the hashing thread is still running;
+        # interrupting it lets the wait cover only the hashes already in flight
+        self.change_worker.requestInterruption()
+        self.change_worker.wait()
+        self._diff_timer.stop()
+        self._read_pool.shutdown(wait=False)
+        self._diff_generation += 1  # Cancel any pending diff batches
+        if self._hash_index_dirty:
+            _save_hash_index(self.project_root)
+        super().done(result)
+
     def _hash_file(self, path):
+        """
+        Digest of `path`, reusing the cached one while (mtime, size) are unchanged.
+        
+        Returns '' for vanished or unreadable files. Raises ValueError if the
+        snapshot's hash algorithm is unavailable.
+        """
+        rel_path = os.path.relpath(path, self.project_root).replace(os.path.sep, '/')
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Vanished files drop out of the index
+            if self._hash_index.pop(rel_path, None) is not None:
+                self._hash_index_dirty = True
+            return ''
+        
+        cached = self._hash_index.get(rel_path)
+        if cached and cached[:3] == [st.st_mtime_ns, st.st_size, self.snapshot_hash]:
+            return cached[3]
         try:
-            with open(path, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
-        except: return ''
+            digest = hash_file(path, self.snapshot_hash)
+        except OSError:
+            return ''
+        self._hash_index[rel_path] = [st.st_mtime_ns, st.st_size, self.snapshot_hash, digest]
+        self._hash_index_dirty = True
+        return digest
     
     def _is_dark(self):
         # Heuristic: check window (dialog) background lightness
@@ -387,7 +554,15 @@ class DiffViewDialog(QDialog):
         return bg.lightness() < 128
 
     def show_diff(self, current_item, previous_item):
+        # Debounced: only the selection that settles (e.g. after arrow-key scrolling) is diffed
+        self._pending_item = current_item
+        self._diff_timer.start()
+
+    def _run_pending_diff(self):
+        current_item = self._pending_item
         if not current_item:
+            self._diff_generation += 1
+            self._rendered_key = None
             self.diff_viewer.clear()
             return
             
@@ -395,74 +570,149 @@ class DiffViewDialog(QDialog):
         if not data: return # "No changes detected" case
         
         status, rel_path = data
+        abs_path = os.path.join(self.project_root, rel_path)
+        
+        # Re-selecting the file already shown (unchanged on disk) is a no-op
+        try:
+            st = os.stat(abs_path)
+            render_key = (status, rel_path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            render_key = None
+        if render_key is not None and render_key == self._rendered_key:
+            return
+        self._rendered_key = render_key
+        
+        self._diff_generation += 1
         self.diff_viewer.clear()
         
         if status == 'removed':
-            self.diff_viewer.setText(f"File removed: {rel_path}")
+            self.diff_viewer.setPlainText(f"File removed: {rel_path}")
             return
             
-        abs_path = os.path.join(self.project_root, rel_path)
-        if not os.path.exists(abs_path):
-            self.diff_viewer.setText("Error: File not found on disk.")
+        if render_key is None:
+            self.diff_viewer.setPlainText("Error: File not found on disk.")
             return
 
+        # MODIFIED: Try to find cached original, read on the pool while the
+        # current version is read here
+        # Cache is stored as BLAKE2b(rel_path) inside .vibecode/cache/ (MD5 in older caches)
+        old_future = None
+        if status != 'added':
+            cache_dir = os.path.join(self.project_root, '.vibecode', 'cache')
+            cache_path = os.path.join(cache_dir, cache_file_name(rel_path))
+            if not os.path.exists(cache_path):
+                cache_path = os.path.join(cache_dir, cache_file_name(rel_path, legacy=True))
+            if os.path.exists(cache_path):
+                old_future = self._read_pool.submit(self._read_lines, cache_path)
+
         # Read Current
         try:
-            with open(abs_path, 'r', encoding='utf-8', errors='replace') as f:
-                current_lines = f.readlines()
+            if status == 'added':
+                # Just show the file content (one read, no line splitting)
+                with open(abs_path, 'r', encoding='utf-8', errors='replace') as f:
+                    self.diff_viewer.setPlainText(f.read())
+                return
+            current_lines = self._read_lines(abs_path)
         except Exception as e:
-            self.diff_viewer.setText(f"Error reading file: {e}")
-            return
-            
-        if status == 'added':
-            # Just show the file content
-            self.diff_viewer.setPlainText("".join(current_lines))
+            self.diff_viewer.setPlainText(f"Error reading file: {e}")
             return
         
-        # MODIFIED: Try to find cached original
-        # Cache is stored as MD5(rel_path) inside .vibecode/cache/
-        cache_name = hashlib.md5(rel_path.encode()).hexdigest()
-        cache_path = os.path.join(self.project_root, '.vibecode', 'cache', cache_name)
-        
         old_lines = []
-        if os.path.exists(cache_path):
+        notice = None
+        if old_future is not None:
             try:
-                with open(cache_path, 'r', encoding='utf-8', errors='replace') as f:
-                    old_lines = f.readlines()
-            except:
+                old_lines = old_future.result()
+            except Exception:
                 old_lines = []
-                self.diff_viewer.append("<i>(Warning: Could not read cached original version)</i>")
+                notice = "(Warning: Could not read cached original version)"
         else:
-            self.diff_viewer.append("<i>(No cached version found for diff. Generation required to seed cache.)</i>\n")
-        
-        # Generate Diff
-        import difflib
-        diff = difflib.unified_diff(
-            old_lines, current_lines,
-            fromfile=f"Old ({rel_path})",
-            tofile=f"New ({rel_path})"
-        )
+            notice = "(No cached version found for diff. Generation required to seed cache.)\n"
+        
+        # Generate Diff (git's C implementation for large files, difflib otherwise)
+        diff = None
+        if notice is None and max(os.path.getsize(abs_path), os.path.getsize(cache_path)) > GIT_DIFF_THRESHOLD:
+            diff = self._git_diff(cache_path, abs_path, rel_path)
+        if diff is None:
+            import difflib
+            diff = difflib.unified_diff(
+                old_lines, current_lines,
+                fromfile=f"Old ({rel_path})",
+                tofile=f"New ({rel_path})"
+            )
         
-        # Render with colors
-        html = ""
-        for line in diff:
-            line = line.rstrip()
-            if line.startswith('---') or line.startswith('+++'):
-                color = "#888888" # Grey
-            elif line.startswith('@@'):
-                color = "#3498DB" # Blue
-            elif line.startswith('+'):
-                color = "#2ECC71" if self._is_dark() else "green"
-            elif line.startswith('-'):
-                color = "#E74C3C" if self._is_dark() else "red"
-            else:
-                color = "#FFFFFF" if self._is_dark() else "black"
-            
-            # Escape HTML characters
-            line_esc = line.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            html += f'<div style="color: {color}; white-space: pre;">{line_esc}</div>'
-            
-        self.diff_viewer.setHtml(html)
+        # Render with colors (formats are prepared once in __init__)
+        if notice:
+            notice_fmt = QTextCharFormat(self._ctx_fmt)
+            notice_fmt.setFontItalic(True)
+            QTextCursor(self.diff_viewer.document()).insertText(notice + "\n", notice_fmt)
+        self._insert_diff_batch(iter(diff), self._diff_generation)
+
+    def _insert_diff_batch(self, lines, generation):
+        """Insert the next DIFF_BATCH_LINES diff lines, then yield to the event loop."""
+        if generation != self._diff_generation:
+            return  # Another file was selected (or the dialog closed)
+        
+        line_formats, ctx_fmt, header_fmt = self._line_formats, self._ctx_fmt, self._header_fmt
+        batch = list(itertools.islice(lines, DIFF_BATCH_LINES))
+        cursor = QTextCursor(self.diff_viewer.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        self.diff_viewer.setUpdatesEnabled(False)
+        cursor.beginEditBlock()
+        try:
+            for line in batch:
+                line = line.rstrip()
+                fmt = line_formats.get(line[:1], ctx_fmt)
+                if line[:3] in ('---', '+++'):
+                    fmt = header_fmt
+                cursor.insertText(line + "\n", fmt)
+        finally:
+            cursor.endEditBlock()
+            self.diff_viewer.setUpdatesEnabled(True)
+        
+        if len(batch) == DIFF_BATCH_LINES:
+            QTimer.singleShot(0, functools.partial(self._insert_diff_batch, lines, generation))
+
+    def _git_diff(self, old_path, new_path, rel_path):
+        """
+        Unified diff lines from `git diff --no-index`, or None if git is unavailable.
+        The git preamble is dropped and the file headers relabelled like difflib's;
+        binary files get a one-line notice instead of an empty diff.
+        """
+        git = shutil.which('git')
+        if not git:
+            return None
+        try:
+            result = subprocess.run(
+                [git, 'diff', '--no-index', '--no-color', '-U3', '--', old_path, new_path],
+                capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=30
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode not in (0, 1):  # 1 means "files differ"
+            return None
+        
+        lines = result.stdout.splitlines()
+        for i, line in enumerate(lines):
+            if line.startswith('--- '):
+                return [f"--- Old ({rel_path})", f"+++ New ({rel_path})"] + lines[i + 2:]
+            if line.startswith('Binary files '):
+                return [f"(Binary file: {rel_path} differs from the cached original)"]
+        # No hunks: identical files, or something git reports in its own words
+        return lines[1:] if lines[:1] and lines[0].startswith('diff --git ') else lines
+
+    @staticmethod
+    def _read_lines(path):
+        # Text-mode readlines() splits in C with universal newlines; it measured
+        # faster than read_bytes().decode().splitlines(keepends=True), which
+        # would also split on \x0c, \x85 and U+2028 and so change the diff
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.readlines()
+
+    @staticmethod
+    def _line_format(color):
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor(color))
+        return fmt
 
 
 # --- BATCH EXPORT DIALOG ---
@@ -516,10 +766,12 @@ class BatchExportDialog(QDialog):
         self.btn_export.clicked.connect(self.start_export)
         btn_layout.addWidget(self.btn_export)
         
-        btn_cancel = QPushButton("Close")
-        btn_cancel.clicked.connect(self.accept)
-        btn_layout.addWidget(btn_cancel)
+        self.btn_close = QPushButton("Close")
+        self.btn_close.clicked.connect(self.accept)
+        btn_layout.addWidget(self.btn_close)
         layout.addLayout(btn_layout)
+        
+        self.export_worker = None
     
     def start_export(self):
         """Start batch export of selected projects."""
@@ -535,40 +787,25 @@ class BatchExportDialog(QDialog):
         self.progress_bar.setMaximum(len(self.selected_projects))
         self.progress_bar.setValue(0)
         self.btn_export.setEnabled(False)
-        
-        errors = []
-        for i, proj_path in enumerate(self.selected_projects):
-            config_path = os.path.join(proj_path, '.vibecode.yaml')
-            proj_name = os.path.basename(proj_path)
-            
-            self.progress_label.setText(f"Exporting: {proj_name}...")
-            QApplication.processEvents()
-            
-            try:
-                # Read config for output name preference
-                import yaml
-                base_name = proj_name # Default
-                if os.path.exists(config_path):
-                    with open(config_path, 'r') as f:
-                        data = yaml.safe_load(f) or {}
-                        base_name = data.get('output_name', proj_name)
-
-                engine = ProjectEngine(config_path)
-                
-                if export_type in ["Human PDF", "Both"]:
-                    engine.render(pipeline_type='human', 
-                                  output_path_override=os.path.join(proj_path, f'{base_name}_human.pdf'))
-                
-                if export_type in ["LLM PDF", "Both"]:
-                    engine.render(pipeline_type='llm',
-                                  output_path_override=os.path.join(proj_path, f'{base_name}_llm.pdf'))
-                
-            except Exception as e:
-                errors.append(f"{proj_name}: {str(e)}")
-            
-            self.progress_bar.setValue(i + 1)
-        
+        # Closing mid-batch cancels the projects not yet started
+        self.btn_close.setText("Cancel")
+        
+        # Projects render one at a time off the GUI thread
+        self.export_worker = BatchExportWorker(self.selected_projects, export_type)
+        self.export_worker.project_started.connect(self._on_project_started)
+        self.export_worker.progress_update.connect(self._on_export_progress)
+        self.export_worker.finished_success.connect(self._on_export_finished)
+        self.export_worker.start()
+    
+    def _on_project_started(self, name):
+        self.progress_label.setText(f"Exporting: {name}...")
+    
+    def _on_export_progress(self, done, total):
+        self.progress_bar.setValue(done)
+    
+    def _on_export_finished(self, errors):
         self.btn_export.setEnabled(True)
+        self.btn_close.setText("Close")
         self.progress_label.setText(f"Completed {len(self.selected_projects)} projects")
         
         if errors:
@@ -577,6 +814,19 @@ class BatchExportDialog(QDialog):
         else:
             QMessageBox.information(self, "Export Complete",
                 f"Successfully exported {len(self.selected_projects)} projects!")
+    
+    def done(self, result):
+        # Stop the batch after the current render without waiting for it: the
+        # application keeps the thread alive and deletes it once it returns
+        if self.export_worker is not None and self.export_worker.isRunning():
+            self.export_worker.requestInterruption()
+            self.export_worker.project_started.disconnect()
+            self.export_worker.progress_update.disconnect()
+            self.export_worker.finished_success.disconnect()
+            self.export_worker.setParent(QApplication.instance())
+            self.export_worker.finished.connect(self.export_worker.deleteLater)
+            self.export_worker = None
+        super().done(result)
 
 
 # --- RESTORE / UNPACK DIALOG ---
@@ -706,19 +956,63 @@ class RestoreDialog(QDialog):
 
 
 # --- SECRET REVIEW DIALOG ---
+def _truncate_middle(text, budget=120):
+    """Shorten text to about `budget` chars, keeping both ends around an omission marker."""
+    if len(text) <= budget:
+        return text
+    left = budget // 2 - 2
+    right = budget - left - 1
+    return f"{text[:left]}…({len(text) - left - right} chars)…{text[-right:]}"
+
+
+def _secret_info_html(item):
+    """Rich-text summary of a secret candidate for its review row."""
+    val = item['value']
+    masked = val[:8] + '...' + val[-4:] if len(val) > 16 else val
+    # Context is truncated first, so the label only ever lays out a bounded string
+    context = _truncate_middle(item['context'])
+    file_info = item.get('file', 'Unknown')
+    return (
+        f"<b style='color: #FF9999;'>{html.escape(item['type'])}</b><br>"
+        f"<span style='color: #888; font-size: 9pt;'>📄 {html.escape(file_info)} : Line {item['line']}</span><br>"
+        f"<code style='color: #CCCCCC;'>{html.escape(context)}</code><br>"
+        f"<span style='color: #AAAAAA;'>Value: <code>{html.escape(masked)}</code></span>"
+    )
+
+
 class SecretReviewDialog(QDialog):
     """
     Interactive 'Quarantine' interface for reviewing potential secrets.
     Users must review and decide on each candidate before PDF generation proceeds.
     """
     
+    # Candidate rows built per page; more are added as the list is scrolled
+    ROW_BATCH = 50
+    
+    # Row styling, parsed once for the dialog instead of once per row widget.
+    # The row rule also covers its children, as the per-row sheet used to.
+    ROW_STYLESHEET = (
+        "QWidget#SecretRow, QWidget#SecretRow * { background-color: #252526; "
+        "border: 1px solid #444; border-radius: 4px; padding: 8px; }"
+        "QPushButton#RedactBtn, QPushButton#IgnoreBtn { padding: 6px 12px; }"
+        "QPushButton#RedactBtn:checked { background-color: #D32F2F; color: white; }"
+        "QPushButton#IgnoreBtn:checked { background-color: #388E3C; color: white; }"
+    )
+    
     def __init__(self, scanner, candidates: list, parent=None):
         super().__init__(parent)
         self.setWindowTitle("🔒 Security Quarantine: Potential Secrets Detected")
         self.resize(900, 600)
+        self.setStyleSheet(self.ROW_STYLESHEET)
         self.scanner = scanner
         self.candidates = candidates
-        self.item_widgets = {}  # Track widgets by value
+        # (redact, ignore) buttons of every built row, by value. A value found in
+        # several files has several rows, all sharing one action.
+        self.item_widgets = {}
+        # Chosen action per value, 'redact' (default secure state) or 'ignore'.
+        # The scanner is only updated on accept, so Cancel leaves it untouched.
+        self.actions = dict.fromkeys((item['value'] for item in candidates), 'redact')
+        self._rows_built = 0
         
         layout = QVBoxLayout(self)
         
@@ -747,12 +1041,16 @@ class SecretReviewDialog(QDialog):
         scroll_widget = QWidget()
         self.list_layout = QVBoxLayout(scroll_widget)
         self.list_layout.setSpacing(8)
-        
-        for item in self.candidates:
-            self._add_item(item)
-        
         self.list_layout.addStretch()
+        
+        # Row widgets are only built as they are scrolled into reach.
+        # Rows are built while scroll_widget is still detached from the scroll area
+        self._load_more_rows()
         scroll.setWidget(scroll_widget)
+        self.scroll_bar = scroll.verticalScrollBar()
+        self.scroll_bar.valueChanged.connect(self._on_scrolled)
+        # Also re-check after relayouts, in case the built rows don't fill the view
+        self.scroll_bar.rangeChanged.connect(self._on_scroll_range_changed)
         layout.addWidget(scroll)
         
         # Button Bar
@@ -783,45 +1081,44 @@ class SecretReviewDialog(QDialog):
         btn_box.addWidget(btn_proceed)
         layout.addLayout(btn_box)
     
+    def _load_more_rows(self):
+        """Build the next ROW_BATCH candidate rows (above the trailing stretch)."""
+        batch = self.candidates[self._rows_built:self._rows_built + self.ROW_BATCH]
+        if not batch:
+            return
+        scroll_widget = self.list_layout.parentWidget()
+        scroll_widget.setUpdatesEnabled(False)
+        for item in batch:
+            self._add_item(item)
+        scroll_widget.setUpdatesEnabled(True)
+        self._rows_built += len(batch)
+    
+    def _on_scrolled(self, value):
+        # Near the bottom: materialize the next page of rows
+        if value >= self.scroll_bar.maximum() - self.scroll_bar.pageStep() // 2:
+            self._load_more_rows()
+    
+    def _on_scroll_range_changed(self, minimum, maximum):
+        self._on_scrolled(self.scroll_bar.value())
+    
     def _add_item(self, item):
         """Create a row widget for a secret candidate."""
         widget = QWidget()
-        widget.setStyleSheet(
-            "background-color: #252526; border: 1px solid #444; "
-            "border-radius: 4px; padding: 8px;"
-        )
+        widget.setObjectName("SecretRow")
         row_layout = QHBoxLayout(widget)
         row_layout.setContentsMargins(10, 8, 10, 8)
         
-        # Info section
-        info_layout = QVBoxLayout()
+        # Info section: type, location, context and masked value in one label.
+        # The markup is built once per candidate and kept on the item.
+        info_html = item.get('_info_html')
+        if info_html is None:
+            info_html = item['_info_html'] = _secret_info_html(item)
+        info = QLabel(info_html)
+        info.setObjectName("SecretInfo")
+        info.setTextFormat(Qt.TextFormat.RichText)
+        info.setWordWrap(True)
         
-        # Type and confidence
-        type_label = QLabel(f"<b>{item['type']}</b>")
-        type_label.setStyleSheet("color: #FF9999;")
-        
-        # File and line
-        file_info = item.get('file', 'Unknown')
-        location = QLabel(f"📄 {file_info} : Line {item['line']}")
-        location.setStyleSheet("color: #888; font-size: 9pt;")
-        
-        # Context (truncated)
-        context = QLabel(f"<code>{item['context']}</code>")
-        context.setStyleSheet("font-family: Consolas; color: #CCCCCC;")
-        context.setWordWrap(True)
-        
-        # Value preview (partially masked)
-        val = item['value']
-        masked = val[:8] + '...' + val[-4:] if len(val) > 16 else val
-        value_label = QLabel(f"Value: <code>{masked}</code>")
-        value_label.setStyleSheet("color: #AAAAAA;")
-        
-        info_layout.addWidget(type_label)
-        info_layout.addWidget(location)
-        info_layout.addWidget(context)
-        info_layout.addWidget(value_label)
-        
-        row_layout.addLayout(info_layout, stretch=1)
+        row_layout.addWidget(info, stretch=1)
         
         # Action buttons
         btn_layout = QVBoxLayout()
@@ -829,21 +1126,15 @@ class SecretReviewDialog(QDialog):
         btn_redact = QPushButton("🔴 Redact")
         btn_redact.setCheckable(True)
         btn_redact.setChecked(True)  # Default to redact (secure)
-        btn_redact.setStyleSheet(
-            "QPushButton { padding: 6px 12px; }"
-            "QPushButton:checked { background-color: #D32F2F; color: white; }"
-        )
+        btn_redact.setObjectName("RedactBtn")
         
         btn_ignore = QPushButton("🟢 Ignore")
         btn_ignore.setCheckable(True)
-        btn_ignore.setStyleSheet(
-            "QPushButton { padding: 6px 12px; }"
-            "QPushButton:checked { background-color: #388E3C; color: white; }"
-        )
+        btn_ignore.setObjectName("IgnoreBtn")
         
         # Mutual exclusivity
-        btn_redact.clicked.connect(lambda: self._set_action(item['value'], 'redact', btn_redact, btn_ignore))
-        btn_ignore.clicked.connect(lambda: self._set_action(item['value'], 'ignore', btn_redact, btn_ignore))
+        btn_redact.clicked.connect(functools.partial(self._set_action, item['value'], 'redact'))
+        btn_ignore.clicked.connect(functools.partial(self._set_action, item['value'], 'ignore'))
         
         btn_layout.addWidget(btn_redact)
         btn_layout.addWidget(btn_ignore)
@@ -851,39 +1142,59 @@ class SecretReviewDialog(QDialog):
         
         row_layout.addLayout(btn_layout)
         
-        self.list_layout.addWidget(widget)
-        self.item_widgets[item['value']] = (btn_redact, btn_ignore)
-        
-        # Pre-register as redaction (default secure state)
-        self.scanner.add_redaction(item['value'])
-    
-    def _set_action(self, value: str, action: str, btn_redact, btn_ignore):
-        """Handle toggling between Redact and Ignore for a value."""
-        if action == 'redact':
-            btn_redact.setChecked(True)
-            btn_ignore.setChecked(False)
-            self.scanner.add_redaction(value)
-        else:
+        # Reflect any bulk Redact/Ignore All applied before the row existed
+        if self.actions[item['value']] == 'ignore':
             btn_redact.setChecked(False)
             btn_ignore.setChecked(True)
-            self.scanner.add_to_whitelist(value)
+        
+        self.list_layout.insertWidget(self.list_layout.count() - 1, widget)
+        self.item_widgets.setdefault(item['value'], []).append((btn_redact, btn_ignore))
+    
+    def _set_action(self, value: str, action: str, checked: bool = False):
+        """Handle toggling between Redact and Ignore for a value.
+        `checked` absorbs the bool that QPushButton.clicked passes along."""
+        for btn_redact, btn_ignore in self.item_widgets[value]:
+            btn_redact.setChecked(action == 'redact')
+            btn_ignore.setChecked(action != 'redact')
+        self.actions[value] = action
     
     def redact_all(self):
         """Mark all candidates for redaction."""
-        for value, (btn_redact, btn_ignore) in self.item_widgets.items():
-            btn_redact.setChecked(True)
-            btn_ignore.setChecked(False)
-            self.scanner.add_redaction(value)
+        self.actions = dict.fromkeys(self.actions, 'redact')
+        self._check_all(redact=True)
     
     def ignore_all(self):
         """Whitelist all candidates."""
-        for value, (btn_redact, btn_ignore) in self.item_widgets.items():
-            btn_redact.setChecked(False)
-            btn_ignore.setChecked(True)
-            self.scanner.add_to_whitelist(value)
+        self.actions = dict.fromkeys(self.actions, 'ignore')
+        self._check_all(redact=False)
+    
+    def accept(self):
+        """Commit every decision to the scanner in two bulk updates, then close."""
+        redact = [value for value, action in self.actions.items() if action == 'redact']
+        ignore = [value for value, action in self.actions.items() if action != 'redact']
+        self.scanner.add_redactions(redact)
+        self.scanner.add_to_whitelist_bulk(ignore)
+        super().accept()
+    
+    def _check_all(self, redact: bool):
+        """Set every built row's buttons with one repaint (setChecked doesn't emit clicked)."""
+        scroll_widget = self.list_layout.parentWidget()
+        scroll_widget.setUpdatesEnabled(False)
+        for rows in self.item_widgets.values():
+            for btn_redact, btn_ignore in rows:
+                btn_redact.setChecked(redact)
+                btn_ignore.setChecked(not redact)
+        scroll_widget.setUpdatesEnabled(True)
 
 
 # --- MODEL SETTINGS DIALOG (ECR #005) ---
+
+# Typing in the custom model field must pause this long before the label updates
+ACTIVE_LABEL_DEBOUNCE_MS = 150
+# Seconds before a connection test gives up (a single attempt, no SDK retries)
+CONNECTION_TEST_TIMEOUT = 20
+
+
 class ModelSettingsDialog(QDialog):
     """
     Dialog for configuring the AI model used by VibeSelect/VibeContext/VibeChat.
@@ -895,12 +1206,8 @@ class ModelSettingsDialog(QDialog):
         self.setWindowTitle("🤖 AI Model Settings")
         self.resize(500, 300)
         
-        from ..settings import get_settings
-        from ..settings import get_settings
-        from ..config import KNOWN_MODELS, DEFAULT_MODEL_ID, get_active_model_id, CUSTOM_PROVIDER_PRESETS
-        from openai import OpenAI
-        
         self.settings = get_settings()
+        self.test_worker = None
         
         layout = QVBoxLayout(self)
         
@@ -913,7 +1220,9 @@ class ModelSettingsDialog(QDialog):
         layout.addWidget(QLabel("Select AI Model:"))
         self.combo_models = QComboBox()
         
-        # Populate dropdown with known models
+        # Populate dropdown with known models. Signals stay blocked until the
+        # initial selection is made; the slots are run once explicitly below.
+        self.combo_models.blockSignals(True)
         for display_name, model_id in KNOWN_MODELS:
             self.combo_models.addItem(display_name, userData=model_id)
         
@@ -930,6 +1239,7 @@ class ModelSettingsDialog(QDialog):
         
         if index >= 0:
             self.combo_models.setCurrentIndex(index)
+        self.combo_models.blockSignals(False)
         
         layout.addWidget(self.combo_models)
         
@@ -944,7 +1254,6 @@ class ModelSettingsDialog(QDialog):
         hint = QLabel("Enter the exact model ID as specified by the provider's API.")
         hint.setStyleSheet("color: #666; font-size: 9pt;")
         
-        custom_layout.addWidget(self.txt_custom)
         custom_layout.addWidget(self.txt_custom)
         custom_layout.addWidget(hint)
         self.group_custom.setLayout(custom_layout)
@@ -952,8 +1261,10 @@ class ModelSettingsDialog(QDialog):
         
         # --- Custom Presets (ECR #006) ---
         self.combo_preset = QComboBox()
+        self.combo_preset.blockSignals(True)
         self.combo_preset.addItem("Select a Preset...")
         self.combo_preset.addItems(CUSTOM_PROVIDER_PRESETS.keys())
+        self.combo_preset.blockSignals(False)
         self.combo_preset.currentTextChanged.connect(self.apply_preset)
         
         # Add to form layout style within group_custom if possible, or just add to custom_layout
@@ -967,7 +1278,6 @@ class ModelSettingsDialog(QDialog):
         custom_layout.addWidget(self.btn_test)
         
         # Toggle custom visibility
-        self.combo_models.currentIndexChanged.connect(self._toggle_custom)
         self._toggle_custom()
         
         # Current Model Display
@@ -979,9 +1289,13 @@ class ModelSettingsDialog(QDialog):
         self._update_active_label()
         layout.addWidget(self.lbl_active)
         
-        # Connect to update label on change
-        self.combo_models.currentIndexChanged.connect(self._update_active_label)
-        self.txt_custom.textChanged.connect(self._update_active_label)
+        # Connect to update label on change; keystrokes are debounced
+        self._label_timer = QTimer(self)
+        self._label_timer.setSingleShot(True)
+        self._label_timer.setInterval(ACTIVE_LABEL_DEBOUNCE_MS)
+        self._label_timer.timeout.connect(self._update_active_label)
+        self.combo_models.currentIndexChanged.connect(self._on_model_combo_changed)
+        self.txt_custom.textChanged.connect(self._schedule_active_label)
         
         # --- API Key Section ---
         line = QFrame()
@@ -993,37 +1307,35 @@ class ModelSettingsDialog(QDialog):
         api_header.setStyleSheet("font-weight: bold; margin-top: 10px; font-size: 11pt;")
         layout.addWidget(api_header)
         
-        api_layout = QGridLayout()
+        api_layout = QFormLayout()
+        self.api_layout = api_layout
         
         # Provider Selection
-        api_layout.addWidget(QLabel("Provider:"), 0, 0)
         self.combo_provider = QComboBox()
+        self.combo_provider.blockSignals(True)
         self.combo_provider.addItems(['google', 'openai', 'anthropic', 'ollama', 'custom'])
         # Set current provider
         curr_provider = self.settings.chat_provider
         idx = self.combo_provider.findText(curr_provider)
         if idx >= 0:
             self.combo_provider.setCurrentIndex(idx)
+        self.combo_provider.blockSignals(False)
         self.combo_provider.currentTextChanged.connect(self._on_provider_changed)
-        api_layout.addWidget(self.combo_provider, 0, 1)
+        api_layout.addRow("Provider:", self.combo_provider)
         
         # API Key Input
         self.lbl_api_key = QLabel("API Key:")
-        api_layout.addWidget(self.lbl_api_key, 1, 0)
-        
         self.txt_api_key = QLineEdit()
         self.txt_api_key.setEchoMode(QLineEdit.EchoMode.Password)
         self.txt_api_key.setPlaceholderText("Enter API key...")
-        api_layout.addWidget(self.txt_api_key, 1, 1)
+        api_layout.addRow(self.lbl_api_key, self.txt_api_key)
         
         # Base URL Input (for custom providers)
         self.lbl_base_url = QLabel("Base URL:")
-        api_layout.addWidget(self.lbl_base_url, 2, 0)
-        
         self.txt_base_url = QLineEdit()
         self.txt_base_url.setPlaceholderText("e.g. http://localhost:1234/v1")
         self.txt_base_url.setText(self.settings.custom_base_url)
-        api_layout.addWidget(self.txt_base_url, 2, 1)
+        api_layout.addRow(self.lbl_base_url, self.txt_base_url)
         
         # Initial state update
         self._on_provider_changed(self.combo_provider.currentText())
@@ -1052,48 +1364,22 @@ class ModelSettingsDialog(QDialog):
         btn_box.addWidget(btn_save)
         layout.addLayout(btn_box)
     
-    def _save_and_close(self):
-        """Save settings and close."""
-        provider = self.combo_provider.currentText()
-        api_key = self.txt_api_key.text().strip()
-        custom_base_url = self.txt_base_url.text().strip()
-        
-        # Save provider
-        self.settings.chat_provider = provider
-        
-        # Save Base URL
-        self.settings.custom_base_url = custom_base_url
-        
-        # Save API key (if provided)
-        if api_key:
-            if not self.settings.set_api_key(provider, api_key):
-                QMessageBox.warning(self, "Keyring Error", "Could not save API key to system keyring.")
-                return # Prevent closing if key storage fails
-        
-        # Update model selection
-        if self.combo_models.currentData() == "custom":
-            custom_model = self.txt_custom.text().strip()
-            if custom_model:
-                self.settings.selected_model_key = "custom"
-                self.settings.custom_model_string = custom_model
-            else:
-                QMessageBox.warning(self, "Invalid Input", "Please enter a Custom Model ID.")
-                return
-        else:
-            self.settings.selected_model_key = self.combo_models.currentData()
-            self.settings.custom_model_string = ""
-            
-        self.accept()
-
+    def _on_model_combo_changed(self, _index):
+        """Single slot for model changes: custom visibility, then the label."""
+        self._toggle_custom()
+        self._update_active_label()
+    
     def _toggle_custom(self):
         """Show/hide custom input based on dropdown selection."""
         is_custom = (self.combo_models.currentData() == "custom")
         self.group_custom.setVisible(is_custom)
     
+    def _schedule_active_label(self, _text=None):
+        """Restart the debounce timer; the label updates once typing pauses."""
+        self._label_timer.start()
+    
     def _update_active_label(self):
         """Update the display showing which model will be used."""
-        from ..config import get_active_model_id
-        
         # Simulate what would be saved
         if self.combo_models.currentData() == "custom":
             model_id = self.txt_custom.text().strip()
@@ -1109,13 +1395,11 @@ class ModelSettingsDialog(QDialog):
         is_ollama = (provider_name == 'ollama')
         is_custom = (provider_name == 'custom')
         
-        # API Key visibility
-        self.lbl_api_key.setVisible(not is_ollama)
-        self.txt_api_key.setVisible(not is_ollama)
+        # API Key visibility (label and field hide together as one form row)
+        self.api_layout.setRowVisible(self.txt_api_key, not is_ollama)
         
         # Base URL visibility (only for Custom)
-        self.lbl_base_url.setVisible(is_custom)
-        self.txt_base_url.setVisible(is_custom)
+        self.api_layout.setRowVisible(self.txt_base_url, is_custom)
         
         if not is_ollama:
             self._update_key_placeholder()
@@ -1147,6 +1431,9 @@ class ModelSettingsDialog(QDialog):
         provider = self.combo_provider.currentText()
         self.settings.chat_provider = provider
         
+        # Base URL is only shown for the custom provider but kept for all
+        self.settings.custom_base_url = self.txt_base_url.text().strip()
+        
         # 3. Save API Key (if provided)
         new_key = self.txt_api_key.text().strip()
         if new_key:
@@ -1157,12 +1444,8 @@ class ModelSettingsDialog(QDialog):
         
         self.accept()
 
-
-
     def apply_preset(self, name: str):
         """Auto-fill settings from selected preset."""
-        from ..config import CUSTOM_PROVIDER_PRESETS
-        
         if name not in CUSTOM_PROVIDER_PRESETS:
             return
             
@@ -1177,10 +1460,11 @@ class ModelSettingsDialog(QDialog):
             self.txt_custom.setText(preset["model_hint"])
             
     def test_connection(self):
-        """Test the custom connection using OpenAI client."""
-        from openai import OpenAI
-        
+        """Test the custom connection using OpenAI client, off the GUI thread."""
         try:
+            if not OPENAI_AVAILABLE:
+                raise ImportError("openai not installed. Run: pip install openai")
+            
             # We enforce testing only for what's currently in the fields
             key = self.txt_api_key.text().strip()
             base_url = self.txt_base_url.text().strip()
@@ -1193,39 +1477,47 @@ class ModelSettingsDialog(QDialog):
             
             if not all([key, base_url, model]):
                 raise ValueError("API key, base URL, and model are required for testing.")
-
-            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            
-            client = OpenAI(api_key=key, base_url=base_url)
-            client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": "ping"}],
-                max_tokens=1
-            )
             
-            QApplication.restoreOverrideCursor()
-            QMessageBox.information(self, "Success", "Connection successful! ✅\nThe provider is reachable and authenticated.")
-
+            client = OpenAI(api_key=key, base_url=base_url,
+                            timeout=CONNECTION_TEST_TIMEOUT, max_retries=0)
         except Exception as e:
-            QApplication.restoreOverrideCursor()
             QMessageBox.critical(self, "Connection Failed", f"Could not connect:\n{str(e)}")
+            return
+        
+        self.btn_test.setEnabled(False)
+        self.btn_test.setText("Testing...")
+        self.test_worker = ConnectionTestWorker(client, model)
+        self.test_worker.finished_success.connect(self._on_test_success)
+        self.test_worker.finished_error.connect(self._on_test_error)
+        self.test_worker.start()
+    
+    def _on_test_success(self):
+        self._reset_test_button()
+        QMessageBox.information(self, "Success", "Connection successful! ✅\nThe provider is reachable and authenticated.")
+    
+    def _on_test_error(self, error_msg):
+        self._reset_test_button()
+        QMessageBox.critical(self, "Connection Failed", f"Could not connect:\n{error_msg}")
+    
+    def _reset_test_button(self):
+        self.btn_test.setEnabled(True)
+        self.btn_test.setText("Test Connection")
+    
+    def done(self, result):
+        # Don't block closing on the network: detach a running test instead.
+        # The application keeps the thread alive and deletes it once it returns.
+        if self.test_worker is not None and self.test_worker.isRunning():
+            self.test_worker.finished_success.disconnect()
+            self.test_worker.finished_error.disconnect()
+            self.test_worker.setParent(QApplication.instance())
+            self.test_worker.finished.connect(self.test_worker.deleteLater)
+            self.test_worker = None
+        super().done(result)
 
 
 # --- HELP DIALOG ---
-class HelpDialog(QDialog):
-    """Robust help dialog explaining how the app works."""
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("How to Use Vibecode")
-        self.resize(700, 600)
-        
-        layout = QVBoxLayout(self)
-        
-        # Help Content
-        content = QTextEdit()
-        content.setReadOnly(True)
-        content.setHtml("""
+
+HELP_HTML = """
         <h2 style="color: #2E8B57;">🚀 Welcome to Vibecode!</h2>
         <p>Vibecode helps you turn your codebases into AI-ready snapshots. Here is the workflow:</p>
         
@@ -1277,7 +1569,36 @@ class HelpDialog(QDialog):
             <tr><td><b>Ctrl+T</b></td><td>Toggle Dark/Light Mode</td></tr>
             <tr><td><b>F5</b></td><td>Reload Project</td></tr>
         </table>
-        """)
+        """
+
+# Parsed HELP_HTML, built on first use and cloned into each HelpDialog
+_HELP_DOC = None
+
+
+def _help_document() -> QTextDocument:
+    """Return the shared help document, parsing HELP_HTML on first call."""
+    global _HELP_DOC
+    if _HELP_DOC is None:
+        # Parented to the application so it is destroyed before Qt shuts down
+        _HELP_DOC = QTextDocument(QApplication.instance())
+        _HELP_DOC.setHtml(HELP_HTML)
+    return _HELP_DOC
+
+
+class HelpDialog(QDialog):
+    """Robust help dialog explaining how the app works."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("How to Use Vibecode")
+        self.resize(700, 600)
+        
+        layout = QVBoxLayout(self)
+        
+        # Help Content
+        content = QTextEdit()
+        content.setReadOnly(True)
+        content.setDocument(_help_document().clone(content))
         layout.addWidget(content)
         
         # Close Button
@@ -1289,6 +1610,39 @@ class HelpDialog(QDialog):
 
 # --- MCP SETTINGS DIALOG ---
 
+def _open_in_editor(path: str):
+    """Open a text file with the platform's default editor/viewer."""
+    if sys.platform == 'win32':
+        subprocess.Popen(['notepad', path])
+    elif sys.platform == 'darwin':
+        subprocess.Popen(['open', path])
+    else:
+        subprocess.Popen(['xdg-open', path])
+
+
+# Tools listed by name in the summary; the rest are only counted
+MCP_TOOLS_SHOWN = 10
+
+# Parsed mcp_servers.json keyed by path: ((mtime_ns, size), config)
+_MCP_CONFIG_CACHE = {}
+
+
+def _load_mcp_config(config_path: Path) -> dict:
+    """
+    Parse the MCP server config, reusing the previous parse until the
+    file's mtime or size changes. Parse errors propagate to the caller.
+    """
+    st = config_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _MCP_CONFIG_CACHE.get(config_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    
+    config = json.loads(config_path.read_bytes())
+    _MCP_CONFIG_CACHE[config_path] = (stamp, config)
+    return config
+
+
 class MCPSettingsDialog(QDialog):
     """
     Dialog for managing MCP server connections.
@@ -1311,6 +1665,10 @@ class MCPSettingsDialog(QDialog):
         """
         super().__init__(parent)
         self.mcp_host = mcp_host
+        # Server name -> (status label, tool count label) of the built rows
+        self._server_rows = {}
+        self._rows_config = None
+        self._populated = False  # Set once the server list has been filled
         self.setWindowTitle("MCP Server Management")
         self.setMinimumSize(500, 400)
         self._setup_ui()
@@ -1354,18 +1712,20 @@ class MCPSettingsDialog(QDialog):
         
         # Tools Summary
         if self.mcp_host and self.mcp_host.available_tools:
-            tools_group = QGroupBox(f"Available Tools ({len(self.mcp_host.available_tools)})")
+            tools = self.mcp_host.available_tools
+            tools_group = QGroupBox(f"Available Tools ({len(tools)})")
             tools_layout = QVBoxLayout(tools_group)
             
-            tools_text = QLabel("<br>".join([
+            # Only the first MCP_TOOLS_SHOWN tools are visited (no slice copy of the list)
+            tools_text = QLabel("<br>".join(
                 f"• <b>{tool['name']}</b>: {tool.get('description', 'No description')[:50]}..."
-                for tool in self.mcp_host.available_tools[:10]
-            ]))
+                for tool in itertools.islice(tools, MCP_TOOLS_SHOWN)
+            ))
             tools_text.setWordWrap(True)
             tools_layout.addWidget(tools_text)
             
-            if len(self.mcp_host.available_tools) > 10:
-                more_label = QLabel(f"<i>...and {len(self.mcp_host.available_tools) - 10} more</i>")
+            if len(tools) > MCP_TOOLS_SHOWN:
+                more_label = QLabel(f"<i>...and {len(tools) - MCP_TOOLS_SHOWN} more</i>")
                 more_label.setStyleSheet("color: gray;")
                 tools_layout.addWidget(more_label)
             
@@ -1389,34 +1749,38 @@ class MCPSettingsDialog(QDialog):
         layout.addLayout(btn_layout)
     
     def _populate_servers(self):
-        """Populate the server list from config."""
-        import json
-        from pathlib import Path
-        
-        # Clear existing
-        while self.server_list_layout.count():
-            child = self.server_list_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        """
+        Populate the server list from config.
         
+        Rows are rebuilt only when the parsed config changes; otherwise the
+        existing rows just have their connection status and tool counts
+        refreshed in place.
+        """
         # Load config
         config_path = Path(__file__).parent.parent / "config" / "mcp_servers.json"
         
         if not config_path.exists():
+            self._clear_server_rows()
             no_config = QLabel("⚠️ No configuration file found. Create config/mcp_servers.json")
             no_config.setStyleSheet("color: orange; padding: 20px;")
             self.server_list_layout.addWidget(no_config)
             return
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = _load_mcp_config(config_path)
         except Exception as e:
+            self._clear_server_rows()
             error_label = QLabel(f"❌ Config error: {e}")
             error_label.setStyleSheet("color: red; padding: 20px;")
             self.server_list_layout.addWidget(error_label)
             return
         
+        # Same parse as the rows on screen: only the status can have changed
+        if config is self._rows_config:
+            self._update_server_status()
+            return
+        
+        self._clear_server_rows()
         servers = config.get('mcpServers', {})
         
         if not servers:
@@ -1426,17 +1790,13 @@ class MCPSettingsDialog(QDialog):
             return
         
         # Build server rows
-        connected_servers = self.mcp_host.connected_servers if self.mcp_host else []
-        
         for name, conf in servers.items():
             row = QWidget()
             row_layout = QHBoxLayout(row)
             row_layout.setContentsMargins(5, 5, 5, 5)
             
             # Status indicator
-            is_connected = name in connected_servers
-            status = "✅" if is_connected else "⚫"
-            status_label = QLabel(status)
+            status_label = QLabel()
             status_label.setFixedWidth(30)
             row_layout.addWidget(status_label)
             
@@ -1451,30 +1811,51 @@ class MCPSettingsDialog(QDialog):
             cmd_label.setStyleSheet("color: gray;")
             row_layout.addWidget(cmd_label, 1)
             
-            # Tool count (if connected)
-            if is_connected and self.mcp_host:
-                tool_count = sum(1 for t in self.mcp_host.available_tools if t.get('server_name') == name)
-                tools_label = QLabel(f"{tool_count} tools")
-                tools_label.setStyleSheet("color: green;")
-                row_layout.addWidget(tools_label)
+            # Tool count (shown while connected)
+            tools_label = QLabel()
+            tools_label.setStyleSheet("color: green;")
+            row_layout.addWidget(tools_label)
             
             self.server_list_layout.addWidget(row)
+            self._server_rows[name] = (status_label, tools_label)
+        
+        self._rows_config = config
+        self._update_server_status()
+    
+    def _update_server_status(self):
+        """Refresh the status indicator and tool count of every server row."""
+        connected_servers = set(self.mcp_host.connected_servers) if self.mcp_host else set()
+        tool_counts = {}
+        if connected_servers:
+            for tool in self.mcp_host.available_tools:
+                server = tool.get('server_name')
+                tool_counts[server] = tool_counts.get(server, 0) + 1
+        
+        for name, (status_label, tools_label) in self._server_rows.items():
+            is_connected = name in connected_servers
+            status_label.setText("✅" if is_connected else "⚫")
+            if is_connected:
+                tools_label.setText(f"{tool_counts.get(name, 0)} tools")
+            tools_label.setVisible(is_connected)
+    
+    def _clear_server_rows(self):
+        """Remove every widget from the server list."""
+        # The first call (from _setup_ui) finds the layout still empty
+        if self._populated:
+            while self.server_list_layout.count():
+                child = self.server_list_layout.takeAt(0)
+                if child.widget():
+                    child.widget().deleteLater()
+        self._populated = True
+        self._server_rows = {}
+        self._rows_config = None
     
     def _open_config(self):
         """Open the MCP config file in system editor."""
-        import subprocess
-        from pathlib import Path
-        
         config_path = Path(__file__).parent.parent / "config" / "mcp_servers.json"
         
         if config_path.exists():
-            import sys
-            if sys.platform == 'win32':
-                subprocess.Popen(['notepad', str(config_path)])
-            elif sys.platform == 'darwin':
-                subprocess.Popen(['open', str(config_path)])
-            else:
-                subprocess.Popen(['xdg-open', str(config_path)])
+            _open_in_editor(str(config_path))
     
     def _refresh(self):
         """Refresh the server list."""
@@ -1483,6 +1864,66 @@ class MCPSettingsDialog(QDialog):
 
 # --- TIME TRAVEL DIALOG ---
 
+# Diffs are clipped to these bounds before display, so one minified line or a
+# huge file can't stall layout; "Show Full Diff" opens the untouched text
+DIFF_MAX_LINE_CHARS = 2000
+DIFF_MAX_LINES = 20000
+
+
+def _clip_diff(diff_text: str):
+    """
+    Bound a unified diff for display.
+    
+    Lines over DIFF_MAX_LINE_CHARS are cut with a count of the dropped chars,
+    and diffs over DIFF_MAX_LINES keep their first and last halves around an
+    elision marker.
+    
+    Returns:
+        Tuple of (display text, whether anything was clipped)
+    """
+    lines = diff_text.split('\n')
+    clipped = False
+    
+    if len(lines) > DIFF_MAX_LINES:
+        half = DIFF_MAX_LINES // 2
+        omitted = len(lines) - 2 * half
+        lines = lines[:half] + [f"… [{omitted} lines omitted] …"] + lines[-half:]
+        clipped = True
+    
+    # Only scan per line when some line can actually be too long
+    if len(diff_text) > DIFF_MAX_LINE_CHARS:
+        for i, line in enumerate(lines):
+            if len(line) > DIFF_MAX_LINE_CHARS:
+                lines[i] = f"{line[:DIFF_MAX_LINE_CHARS]}… [+{len(line) - DIFF_MAX_LINE_CHARS} chars]"
+                clipped = True
+    
+    if not clipped:
+        return diff_text, False
+    return '\n'.join(lines), True
+
+class _DiffHighlighter(QSyntaxHighlighter):
+    """Colours unified-diff lines; blocks are highlighted as they are laid out."""
+    
+    def __init__(self, document):
+        super().__init__(document)
+        self._added_fmt = QTextCharFormat()
+        self._added_fmt.setForeground(QColor("#2ECC71"))
+        self._removed_fmt = QTextCharFormat()
+        self._removed_fmt.setForeground(QColor("#E74C3C"))
+        self._hunk_fmt = QTextCharFormat()
+        self._hunk_fmt.setForeground(QColor("#3498DB"))
+    
+    def highlightBlock(self, text):
+        if text.startswith('+'):
+            if not text.startswith('+++'):
+                self.setFormat(0, len(text), self._added_fmt)
+        elif text.startswith('-'):
+            if not text.startswith('---'):
+                self.setFormat(0, len(text), self._removed_fmt)
+        elif text.startswith('@@'):
+            self.setFormat(0, len(text), self._hunk_fmt)
+
+
 class TimeTravelDialog(QDialog):
     """
     Dialog for comparing two Vibecode PDF snapshots.
@@ -1505,6 +1946,8 @@ class TimeTravelDialog(QDialog):
         """
         super().__init__(parent)
         self.chat_engine = chat_engine
+        self._full_diff = None  # Unclipped text of the diff on screen, if it was clipped
+        self._temp_diff_paths = []  # Files written by _open_full_diff, removed in done()
         self.setWindowTitle("⏰ Time Travel - Snapshot Comparison")
         self.setMinimumSize(1000, 700)
         self._setup_ui()
@@ -1562,13 +2005,23 @@ class TimeTravelDialog(QDialog):
         right_layout = QVBoxLayout(right_widget)
         right_layout.setContentsMargins(5, 0, 0, 0)
         
-        right_layout.addWidget(QLabel("Unified Diff:"))
-        self.diff_viewer = QTextEdit()
+        diff_header = QHBoxLayout()
+        diff_header.addWidget(QLabel("Unified Diff:"))
+        diff_header.addStretch()
+        self.btn_full_diff = QPushButton("📄 Show Full Diff")
+        self.btn_full_diff.setToolTip("This diff was shortened for display; open the complete text")
+        self.btn_full_diff.clicked.connect(self._open_full_diff)
+        self.btn_full_diff.setVisible(False)
+        diff_header.addWidget(self.btn_full_diff)
+        right_layout.addLayout(diff_header)
+        # Plain text, coloured per line by a highlighter: no HTML to build or parse
+        self.diff_viewer = QPlainTextEdit()
         self.diff_viewer.setReadOnly(True)
         self.diff_viewer.setStyleSheet(
             "font-family: Consolas, 'Courier New', monospace; font-size: 10pt;"
         )
-        self.diff_viewer.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+        self.diff_viewer.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.diff_highlighter = _DiffHighlighter(self.diff_viewer.document())
         right_layout.addWidget(self.diff_viewer)
         
         splitter.addWidget(right_widget)
@@ -1664,6 +2117,9 @@ class TimeTravelDialog(QDialog):
         if not current:
             return
         
+        self._full_diff = None
+        self.btn_full_diff.setVisible(False)
+        
         data = current.data(Qt.ItemDataRole.UserRole)
         if not data:
             self.diff_viewer.clear()
@@ -1677,20 +2133,11 @@ class TimeTravelDialog(QDialog):
         diff_text = self.chat_engine.get_file_diff(filename)
         
         if diff_text:
-            # Simple colorization
-            lines = diff_text.split('\n')
-            colored = []
-            for line in lines:
-                if line.startswith('+') and not line.startswith('+++'):
-                    colored.append(f'<span style="color: #2ECC71;">{self._escape_html(line)}</span>')
-                elif line.startswith('-') and not line.startswith('---'):
-                    colored.append(f'<span style="color: #E74C3C;">{self._escape_html(line)}</span>')
-                elif line.startswith('@@'):
-                    colored.append(f'<span style="color: #3498DB;">{self._escape_html(line)}</span>')
-                else:
-                    colored.append(self._escape_html(line))
-            
-            self.diff_viewer.setHtml(f'<pre>{"<br>".join(colored)}</pre>')
+            display_text, clipped = _clip_diff(diff_text)
+            if clipped:
+                self._full_diff = diff_text
+                self.btn_full_diff.setVisible(True)
+            self.diff_viewer.setPlainText(display_text)
         else:
             if change_type == 'added':
                 self.diff_viewer.setPlainText("(New file - no previous version)")
@@ -1699,6 +2146,22 @@ class TimeTravelDialog(QDialog):
             else:
                 self.diff_viewer.setPlainText("(No diff available)")
     
-    def _escape_html(self, text):
-        """Escape HTML special characters."""
-        return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
\ No newline at end of file
+    def _open_full_diff(self):
+        """Write the unclipped diff to a temp file and open it externally."""
+        if self._full_diff is None:
+            return
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.diff',
+                                         prefix='vibecode_', delete=False) as f:
+            f.write(self._full_diff)
+        self._temp_diff_paths.append(f.name)
+        _open_in_editor(f.name)
+    
+    def done(self, result):
+        # Remove the full-diff files handed to the external editor
+        for path in self._temp_diff_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Already gone, or still locked by the editor (Windows)
+        self._temp_diff_paths.clear()
+        super().done(result)
@@ -9,7 +9,6 @@ import shutil
 import platform
 import subprocess
 import threading
-import hashlib
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
@@ -24,7 +23,8 @@ from PyQt6.QtGui import QPalette, QColor, QAction, QShortcut, QKeySequence, QIco
 
 # --- ROBUST IMPORTS ---
 try:
-    from .utils import DEFAULT_EXTENSIONS, PROJECT_COLORS, apply_dark_theme, apply_light_theme
+    from .utils import (DEFAULT_EXTENSIONS, PROJECT_COLORS, SNAPSHOT_HASH, LEGACY_SNAPSHOT_HASH,
+                        apply_dark_theme, apply_light_theme, cache_file_name, hash_bytes)
     from .workers import GenerationWorker, AISelectionWorker, VibeExpandWorker, SecurityScanWorker
     from .dialogs import ExtensionManagerDialog, ScanDialog, DiffViewDialog, BatchExportDialog, HelpDialog, RestoreDialog, SecretReviewDialog, MCPSettingsDialog, TimeTravelDialog, ModelSettingsDialog
     from ..config import get_active_model_id
@@ -35,7 +35,8 @@ try:
     from ..chat.gui import ChatWindow
 except ImportError:
     # Use relative imports when running from installed package
-    from .utils import DEFAULT_EXTENSIONS, PROJECT_COLORS, apply_dark_theme, apply_light_theme
+    from .utils import (DEFAULT_EXTENSIONS, PROJECT_COLORS, SNAPSHOT_HASH, LEGACY_SNAPSHOT_HASH,
+                        apply_dark_theme, apply_light_theme, cache_file_name, hash_bytes)
     from .workers import GenerationWorker, AISelectionWorker, VibeExpandWorker, SecurityScanWorker
     from .dialogs import ExtensionManagerDialog, ScanDialog, DiffViewDialog, BatchExportDialog, HelpDialog, RestoreDialog, SecretReviewDialog, MCPSettingsDialog, TimeTravelDialog
     
@@ -774,6 +775,8 @@ class MainWindow(QMainWindow):
                     old_data = yaml.safe_load(f) or {}
                 if 'last_snapshot' in old_data:
                     data['last_snapshot'] = old_data['last_snapshot']
+                if 'snapshot_hash' in old_data:
+                    data['snapshot_hash'] = old_data['snapshot_hash']
             except: pass
 
         try:
@@ -989,15 +992,18 @@ class MainWindow(QMainWindow):
         
         # Load last snapshot from config
         last_snapshot = {}
+        snapshot_hash = LEGACY_SNAPSHOT_HASH
         if os.path.exists(self.current_config_path):
             try:
                 with open(self.current_config_path, 'r') as f:
                     data = yaml.safe_load(f) or {}
                 last_snapshot = data.get('last_snapshot', {})
+                snapshot_hash = data.get('snapshot_hash', LEGACY_SNAPSHOT_HASH)
             except:
                 pass
             
-        dlg = DiffViewDialog(self.current_project_root, current_files, last_snapshot, self)
+        dlg = DiffViewDialog(self.current_project_root, current_files, last_snapshot, self,
+                             snapshot_hash=snapshot_hash)
         dlg.exec()
 
     def show_batch_export(self):
@@ -1161,11 +1167,10 @@ class MainWindow(QMainWindow):
                     # Calculate hash
                     with open(abs_path, 'rb') as f:
                         content = f.read()
-                    snapshot[rel_path] = hashlib.md5(content).hexdigest()
+                    snapshot[rel_path] = hash_bytes(content)
                     
                     # Cache content (hashed filename to avoid path issues)
-                    safe_name = hashlib.md5(rel_path.encode()).hexdigest()
-                    cache_path = os.path.join(cache_dir, safe_name)
+                    cache_path = os.path.join(cache_dir, cache_file_name(rel_path))
                     with open(cache_path, 'wb') as f:
                         f.write(content)
                         
@@ -1184,6 +1189,7 @@ class MainWindow(QMainWindow):
                 with open(self.current_config_path, 'r') as f:
                     data = yaml.safe_load(f) or {}
             data['last_snapshot'] = snapshot
+            data['snapshot_hash'] = SNAPSHOT_HASH
             with open(self.current_config_path, 'w') as f:
                 yaml.dump(data, f, sort_keys=False)
                 
@@ -5,9 +5,78 @@ Contains default extensions, color presets, and theme helpers.
 
 import os
 import sys
+import mmap
+import hashlib
 from PyQt6.QtGui import QPalette, QColor
 from PyQt6.QtCore import Qt
 
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    blake3 = None
+    BLAKE3_AVAILABLE = False
+
+# --- SNAPSHOT HASHING ---
+# Algorithm used for new `last_snapshot` digests. The name is saved next to the
+# snapshot as `snapshot_hash`, so digests are only compared against digests of
+# the same algorithm; snapshots written before the key existed are MD5.
+# Always stdlib BLAKE2b, so every install can check a snapshot; blake3 (optional)
+# is only needed to read snapshots that an earlier release saved with it.
+SNAPSHOT_HASH = "blake2b"
+LEGACY_SNAPSHOT_HASH = "md5"
+
+
+def _new_hasher(algorithm: str):
+    if algorithm == "blake3":
+        if not BLAKE3_AVAILABLE:
+            raise ValueError(
+                "This snapshot was hashed with blake3, which is not installed. "
+                "Install with: pip install blake3"
+            )
+        return blake3.blake3()
+    return hashlib.new(algorithm)
+
+
+def hash_bytes(data: bytes, algorithm: str = SNAPSHOT_HASH) -> str:
+    """Hex digest of in-memory content with a snapshot hash algorithm."""
+    hasher = _new_hasher(algorithm)
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def hash_file(path: str, algorithm: str = SNAPSHOT_HASH) -> str:
+    """
+    Hex digest of a file's content with a snapshot hash algorithm.
+    
+    Non-empty files are hashed through a read-only mmap, so the file is
+    never copied into a Python bytes object.
+    
+    Raises:
+        OSError: If the file cannot be opened or mapped
+        ValueError: If the algorithm is not available
+    """
+    hasher = _new_hasher(algorithm)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+    return hasher.hexdigest()
+
+
+def cache_file_name(rel_path: str, legacy: bool = False) -> str:
+    """
+    File name for a path's cached original under .vibecode/cache/.
+    
+    The hash only has to be a stable, filesystem-safe name, so it is the
+    cheaper BLAKE2b rather than MD5. `legacy=True` gives the MD5 name used
+    by caches written before the switch.
+    """
+    if legacy:
+        return hashlib.md5(rel_path.encode()).hexdigest()
+    return hashlib.blake2b(rel_path.encode(), digest_size=16).hexdigest()
+
+
 # --- DEFAULT EXTENSIONS ---
 DEFAULT_EXTENSIONS = [
     '.py', '.md', '.yaml', '.yml', '.json', '.js', '.ts',
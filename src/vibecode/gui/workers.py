@@ -5,13 +5,16 @@ in separate threads to keep the UI responsive.
 """
 import os
 import re
-import json
-import zlib
-import base64
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from ..config import SafeLoader
 from ..engine import ProjectEngine
+from ..manifest import decode_payload, decompress_manifest, find_restore_block, parse_manifest
+
+# Visual-scrape file blocks (--force-scrape path), compiled once at import
+_SCRAPE_BLOCK_RE = re.compile(r"--- START_FILE: (.*?) ---\n(.*?)--- END_FILE ---", re.DOTALL)
 
 # --- GENERATION WORKER ---
 
@@ -51,7 +54,7 @@ class GenerationWorker(QThread):
                 # Load original config to get file lists
                 try:
                     with open(self.config_path, 'r', encoding='utf-8') as f:
-                        config_data = yaml.safe_load(f) or {}
+                        config_data = yaml.load(f, Loader=SafeLoader) or {}
                 except Exception as e:
                     self.log_message.emit(f"⚠️ Could not load config: {e}")
                     config_data = {}
@@ -193,18 +196,15 @@ class RestorationWorker(QThread):
                      return
 
             # 3. Attempt Digital Twin Manifest Extraction (The Safe Path)
-            manifest_pattern = r"--- VIBECODE_RESTORE_BLOCK_START ---\s*(.*?)\s*--- VIBECODE_RESTORE_BLOCK_END ---"
-            match = re.search(manifest_pattern, full_text, re.DOTALL)
+            raw_payload = find_restore_block(full_text)
 
             files_restored = 0
             error_message = None
 
-            if match:
+            if raw_payload is not None:
                 self.log_message.emit("⚡ Manifest found! Restoring with 100% fidelity...")
                 import hashlib
                 
-                raw_payload = match.group(1).strip()
-                
                 # Check for checksum (new format: sha256:<hash>\n<payload>)
                 if raw_payload.startswith("sha256:"):
                     try:
@@ -230,9 +230,9 @@ class RestorationWorker(QThread):
 
                 try:
                     # Decode & Decompress
-                    compressed_data = base64.b64decode(payload)
-                    json_bytes = zlib.decompress(compressed_data)
-                    file_map = json.loads(json_bytes.decode('utf-8'))
+                    compressed_data = decode_payload(payload)
+                    json_bytes = decompress_manifest(compressed_data)
+                    file_map = parse_manifest(json_bytes)
                     
                     # Restore Files
                     count = 0
@@ -277,11 +277,8 @@ class RestorationWorker(QThread):
                 self.log_message.emit("Output code may have INVALID INDENTATION.")
                 self.log_message.emit("=" * 50)
                 
-                clean_pattern = r"\\"
-                cleaned_text = re.sub(clean_pattern, "", full_text)
-
-                block_pattern = r"--- START_FILE: (.*?) ---\n(.*?)--- END_FILE ---"
-                matches = re.findall(block_pattern, cleaned_text, re.DOTALL)
+                cleaned_text = full_text.replace("\\", "")
+                matches = _SCRAPE_BLOCK_RE.findall(cleaned_text)
 
                 if not matches:
                     raise ValueError("No files found via text scraping either.")
@@ -520,6 +517,152 @@ class SecurityScanWorker(QThread):
             self.finished_error.emit(str(e))
 
 
+# --- CONNECTION TEST WORKER ---
+
+class ConnectionTestWorker(QThread):
+    """
+    Background worker that sends a one-token request to an OpenAI-compatible
+    endpoint, so the settings dialog stays responsive during the round-trip.
+    """
+    finished_success = pyqtSignal()
+    finished_error = pyqtSignal(str)
+    
+    def __init__(self, client, model: str):
+        """
+        Args:
+            client: Configured OpenAI client (api key and base URL already set)
+            model: Model ID to ping
+        """
+        super().__init__()
+        self.client = client
+        self.model = model
+    
+    def run(self):
+        try:
+            self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": "ping"}],
+                max_tokens=1
+            )
+            self.finished_success.emit()
+        except Exception as e:
+            self.finished_error.emit(str(e))
+
+
+# --- BATCH EXPORT WORKER ---
+
+class BatchExportWorker(QThread):
+    """
+    Exports several registered projects in the background, one at a time.
+    
+    Renders are serialized: WeasyPrint and fpdf make no thread-safety
+    guarantees. An interruption request stops the batch between renders.
+    """
+    project_started = pyqtSignal(str)  # Project name
+    progress_update = pyqtSignal(int, int)  # completed, total
+    finished_success = pyqtSignal(list)  # "name: error" strings, in selection order
+    
+    def __init__(self, project_paths: list, export_type: str):
+        """
+        Args:
+            project_paths: Root directories of the projects to export
+            export_type: "Human PDF", "LLM PDF" or "Both"
+        """
+        super().__init__()
+        self.project_paths = project_paths
+        self.export_type = export_type
+    
+    def _export_project(self, proj_path):
+        """Render one project; returns an error string or None."""
+        config_path = os.path.join(proj_path, '.vibecode.yaml')
+        proj_name = os.path.basename(proj_path)
+        self.project_started.emit(proj_name)
+        
+        try:
+            # Read config for output name preference
+            base_name = proj_name # Default
+            if os.path.exists(config_path):
+                with open(config_path, 'r') as f:
+                    data = yaml.load(f, Loader=SafeLoader) or {}
+                    base_name = data.get('output_name', proj_name)
+
+            engine = ProjectEngine(config_path)
+            
+            if self.export_type in ["Human PDF", "Both"] and not self.isInterruptionRequested():
+                engine.render(pipeline_type='human', 
+                              output_path_override=os.path.join(proj_path, f'{base_name}_human.pdf'))
+            
+            if self.export_type in ["LLM PDF", "Both"] and not self.isInterruptionRequested():
+                engine.render(pipeline_type='llm',
+                              output_path_override=os.path.join(proj_path, f'{base_name}_llm.pdf'))
+            return None
+        except Exception as e:
+            return f"{proj_name}: {str(e)}"
+    
+    def run(self):
+        total = len(self.project_paths)
+        errors = []
+        for completed, path in enumerate(self.project_paths, 1):
+            if self.isInterruptionRequested():
+                return
+            error = self._export_project(path)
+            if error:
+                errors.append(error)
+            self.progress_update.emit(completed, total)
+        self.finished_success.emit(errors)
+
+
+# --- CHANGE DETECTION WORKER ---
+
+class ChangeDetectionWorker(QThread):
+    """
+    Background worker that finds files modified since the last snapshot.
+    Hashes run on a thread pool (file reads release the GIL), off the GUI thread.
+    """
+    finished_success = pyqtSignal(list)  # Sorted relative paths of modified files
+    finished_error = pyqtSignal(str)  # e.g. the snapshot's hash algorithm is unavailable
+    
+    # Hashing is I/O-bound, so oversubscribe the CPUs to overlap disk latency
+    MAX_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+    
+    def __init__(self, project_root: str, rel_paths: list, last_snapshot: dict, hash_func):
+        """
+        Args:
+            project_root: Directory the relative paths are resolved against
+            rel_paths: Files present in both the project and the snapshot
+            last_snapshot: Mapping of relative path -> digest from the last generation
+            hash_func: Callable returning the hex digest for an absolute path,
+                or '' if the file cannot be read; other failures raise
+        """
+        super().__init__()
+        self.project_root = project_root
+        self.rel_paths = rel_paths
+        self.last_snapshot = last_snapshot
+        self.hash_func = hash_func
+    
+    def _is_modified(self, rel_path):
+        # Queued hashes are skipped once the dialog closes
+        if self.isInterruptionRequested():
+            return False
+        # No exists() probe: hash_func already fails softly, and an empty digest
+        # (vanished or unreadable file) is not treated as a modification
+        current_hash = self.hash_func(os.path.join(self.project_root, rel_path))
+        if not current_hash:
+            return False
+        return current_hash != self.last_snapshot.get(rel_path, '')
+    
+    def run(self):
+        try:
+            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+                flags = list(pool.map(self._is_modified, self.rel_paths))
+        except Exception as e:
+            self.finished_error.emit(str(e))
+            return
+        if self.isInterruptionRequested():
+            return
+        self.finished_success.emit(sorted(f for f, changed in zip(self.rel_paths, flags) if changed))
+
+
 # --- CHAT STREAM WORKER ---
 
 class ChatStreamWorker(QThread):
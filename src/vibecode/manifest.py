@@ -0,0 +1,190 @@
+"""
+Digital Twin Manifest codec.
+
+The renderers embed a compressed JSON map of {rel_path: content} in every
+snapshot; the CLI, the GUI unpack worker and chat ingest restore from it.
+Payloads are zstd-compressed when the optional `zstandard` package is
+installed and zlib-compressed otherwise. Decoding dispatches on the frame
+magic, so snapshots written either way restore on any install that can
+decode them.
+
+Manifests over FRAME_SIZE are written in the framed VMZ1 layout, which
+releases that predate it cannot unpack; smaller manifests keep the
+single-stream format every release reads.
+"""
+import os
+import json
+import zlib
+import base64
+import struct
+import binascii
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstd = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Sentinels around the restore block embedded by the renderers
+MANIFEST_START = "--- VIBECODE_RESTORE_BLOCK_START ---"
+MANIFEST_END = "--- VIBECODE_RESTORE_BLOCK_END ---"
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZSTD_LEVEL = 10
+
+# Framed payloads: VMZ1 | frame count (<I) | frame sizes (<I each) | frames.
+# Each frame is an independent zstd/zlib stream so frames decode in parallel.
+FRAMED_MAGIC = b"VMZ1"
+FRAME_SIZE = 4 * 1024 * 1024  # uncompressed bytes per frame
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# base64 characters decoded per step (a multiple of 4, so windows stay aligned)
+B64_WINDOW = 4 * 16384
+_B64_WHITESPACE = b" \t\r\n\v\f"
+
+
+def _compress_frame(chunk) -> bytes:
+    if ZSTD_AVAILABLE:
+        return zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(chunk)
+    return zlib.compress(chunk)
+
+
+def _decompress_frame(data) -> bytes:
+    if bytes(data[:4]) == ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise ImportError(
+                "This snapshot's manifest is zstd-compressed. "
+                "Install with: pip install zstandard"
+            )
+        # Frames written by ZstdCompressor.compress carry their content size
+        return zstd.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def compress_manifest(json_bytes: bytes) -> bytes:
+    """
+    Compress serialized manifest JSON (zstd when available, else zlib).
+
+    Manifests larger than FRAME_SIZE are split into independently
+    compressed frames behind a small offset index, compressed on a thread
+    pool (both codecs release the GIL). Only this release and newer can
+    decode the framed layout.
+    """
+    if len(json_bytes) <= FRAME_SIZE:
+        return _compress_frame(json_bytes)
+
+    view = memoryview(json_bytes)
+    chunks = [view[i:i + FRAME_SIZE] for i in range(0, len(json_bytes), FRAME_SIZE)]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        frames = list(pool.map(_compress_frame, chunks))
+
+    header = FRAMED_MAGIC + struct.pack(f"<I{len(frames)}I", len(frames), *map(len, frames))
+    return b"".join([header, *frames])
+
+
+def decompress_manifest(data: bytes) -> bytes:
+    """
+    Decompress a manifest payload written by compress_manifest.
+
+    Framed payloads are decoded frame-by-frame on a thread pool over
+    zero-copy memoryview slices; single-stream payloads (all older
+    snapshots) are decoded directly.
+
+    Raises:
+        ImportError: If the payload is zstd and `zstandard` is not installed
+        zlib.error: If a zlib payload is corrupt
+        ValueError: If a framed payload's index or frames are truncated
+    """
+    if data[:4] != FRAMED_MAGIC:
+        return _decompress_frame(data)
+
+    if len(data) < 8:
+        raise ValueError("Truncated manifest payload.")
+    (count,) = struct.unpack_from("<I", data, 4)
+    if 8 + 4 * count > len(data):
+        raise ValueError("Truncated manifest payload.")
+    sizes = struct.unpack_from(f"<{count}I", data, 8)
+    view = memoryview(data)
+    offset = 8 + 4 * count
+    frames = []
+    for size in sizes:
+        frames.append(view[offset:offset + size])
+        offset += size
+    if offset > len(data):
+        raise ValueError("Truncated manifest payload.")
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        return b"".join(pool.map(_decompress_frame, frames))
+
+
+def parse_manifest(json_bytes: bytes) -> Dict[str, str]:
+    """
+    Parse decompressed manifest JSON into {rel_path: content}.
+
+    orjson (optional) parses the bytes directly, skipping both the slower
+    stdlib parser and the intermediate UTF-8 decode.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(json_bytes)
+    return json.loads(json_bytes.decode('utf-8'))
+
+
+def decode_payload(payload: str) -> bytes:
+    """
+    Base64-decode a restore-block payload in fixed-size windows.
+
+    Decoding 64 KiB of text at a time into one growing buffer avoids a
+    second full-size temporary alongside the (already large) payload.
+    Payloads carrying stray non-base64 characters fall back to the
+    lenient whole-buffer b64decode.
+    """
+    data = payload.encode('ascii', 'ignore').translate(None, _B64_WHITESPACE)
+    out = bytearray()
+    try:
+        for i in range(0, len(data), B64_WINDOW):
+            out += binascii.a2b_base64(data[i:i + B64_WINDOW])
+    except binascii.Error:
+        return base64.b64decode(data)
+    return bytes(out)
+
+
+def find_restore_block(text: str) -> Optional[str]:
+    """
+    Return the stripped content between the restore-block sentinels, or None.
+
+    Two linear str.find scans: unlike a DOTALL `.*?` regex there is no
+    backtracking when the end sentinel is missing from a corrupt snapshot.
+    """
+    start = text.find(MANIFEST_START)
+    if start == -1:
+        return None
+    start += len(MANIFEST_START)
+    end = text.find(MANIFEST_END, start)
+    if end == -1:
+        return None
+    return text[start:end].strip()
+
+
+def split_checksum(raw_payload: str) -> Tuple[str, Optional[str]]:
+    """
+    Separate the optional `sha256:<hash>` header from a restore block.
+
+    Whitespace introduced by PDF line wrapping is scrubbed from the payload.
+
+    Returns:
+        Tuple of (base64 payload, expected sha256 hex or None)
+    """
+    if raw_payload.startswith("sha256:") and "\n" in raw_payload:
+        checksum_line, payload = raw_payload.split("\n", 1)
+        return "".join(payload.split()), checksum_line.split(":", 1)[1].strip()
+    return raw_payload, None
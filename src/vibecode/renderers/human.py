@@ -4,7 +4,6 @@ Generates syntax-highlighted PDFs using WeasyPrint for human consumption.
 """
 import os
 import json
-import zlib
 import base64
 import concurrent.futures
 import mistune
@@ -16,6 +15,7 @@ from weasyprint import HTML, CSS
 from typing import List, Tuple, Dict
 
 from .secrets import scrub_secrets
+from ..manifest import compress_manifest
 
 # --- STANDALONE HELPERS ---
 
@@ -148,7 +148,7 @@ class HumanRenderer:
             
             # Compress and Encode
             json_bytes = json.dumps(manifest).encode('utf-8')
-            compressed = zlib.compress(json_bytes)
+            compressed = compress_manifest(json_bytes)
             b64_payload = base64.b64encode(compressed).decode('utf-8')
             
             # Calculate SHA-256 Checksum (Extension 1)
@@ -4,13 +4,13 @@ Generates plain-text PDFs using FPDF, optimized for LLM context windows.
 """
 import os
 import json
-import zlib
 import base64
 import hashlib
 from fpdf import FPDF
 from typing import List, Tuple, Dict
 
 from .secrets import scrub_secrets
+from ..manifest import compress_manifest
 
 # --- CONFIGURATION ---
 FONT_NAME = 'NotoSansMono-Regular.ttf'
@@ -163,7 +163,7 @@ class LLMRenderer:
             
             # Compress and Encode
             json_bytes = json.dumps(manifest).encode('utf-8')
-            compressed = zlib.compress(json_bytes)
+            compressed = compress_manifest(json_bytes)
             b64_payload = base64.b64encode(compressed).decode('utf-8')
             
             # Append to PDF as a hidden block (white text, 1pt font)
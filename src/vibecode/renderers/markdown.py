@@ -4,12 +4,12 @@ Generates a single Markdown file snapshot of the codebase.
 """
 import os
 import json
-import zlib
 import base64
 import hashlib
 from typing import List, Tuple, Dict
 
 from .secrets import scrub_secrets
+from ..manifest import compress_manifest
 
 # --- UTILITIES ---
 
@@ -99,7 +99,7 @@ class MarkdownRenderer:
             
             # Compress and Encode
             json_bytes = json.dumps(manifest).encode('utf-8')
-            compressed = zlib.compress(json_bytes)
+            compressed = compress_manifest(json_bytes)
             b64_payload = base64.b64encode(compressed).decode('utf-8')
             
             # Calculate SHA-256 Checksum (Extension 1)
@@ -193,6 +193,19 @@ class SecretScanner:
         if value in self.whitelist:
             self.whitelist.remove(value)
     
+    def add_to_whitelist_bulk(self, values):
+        """Add many values to the ignore list in one set update."""
+        values = set(values)
+        self.whitelist |= values
+        for value in values & self.redaction_map.keys():
+            del self.redaction_map[value]
+    
+    def add_redactions(self, values, replacement: str = '[REDACTED SECRET]'):
+        """Mark many values for redaction in one dict/set update."""
+        values = set(values)
+        self.redaction_map.update(dict.fromkeys(values, replacement))
+        self.whitelist -= values
+    
     def apply_redactions(self, text: str) -> str:
         """Applies all registered redactions to the text."""
         result = text
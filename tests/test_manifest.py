@@ -0,0 +1,94 @@
+
+import unittest
+import base64
+import json
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from vibecode import manifest
+from vibecode.manifest import (
+    FRAMED_MAGIC, compress_manifest, decompress_manifest, decode_payload, parse_manifest
+)
+
+
+class TestManifestRoundTrip(unittest.TestCase):
+
+    def setUp(self):
+        self.original_frame_size = manifest.FRAME_SIZE
+        # Small frames so the framed path runs without megabytes of test data
+        manifest.FRAME_SIZE = 1024
+
+    def tearDown(self):
+        manifest.FRAME_SIZE = self.original_frame_size
+
+    def _manifest_bytes(self, file_count):
+        files = {f"src/file_{i}.py": f"print({i})\n" * (i % 7 + 1) for i in range(file_count)}
+        return files, json.dumps(files).encode('utf-8')
+
+    def test_single_frame(self):
+        files, json_bytes = self._manifest_bytes(5)
+        self.assertLessEqual(len(json_bytes), manifest.FRAME_SIZE)
+        compressed = compress_manifest(json_bytes)
+        self.assertNotEqual(compressed[:4], FRAMED_MAGIC)
+        self.assertEqual(decompress_manifest(compressed), json_bytes)
+        self.assertEqual(parse_manifest(decompress_manifest(compressed)), files)
+
+    def test_framed(self):
+        files, json_bytes = self._manifest_bytes(500)
+        self.assertGreater(len(json_bytes), 3 * manifest.FRAME_SIZE)
+        compressed = compress_manifest(json_bytes)
+        self.assertEqual(compressed[:4], FRAMED_MAGIC)
+        self.assertEqual(decompress_manifest(compressed), json_bytes)
+        self.assertEqual(parse_manifest(decompress_manifest(compressed)), files)
+
+    def test_framed_exact_multiple(self):
+        json_bytes = b"x" * (manifest.FRAME_SIZE * 4)
+        self.assertEqual(decompress_manifest(compress_manifest(json_bytes)), json_bytes)
+
+    def test_truncated_frames(self):
+        _, json_bytes = self._manifest_bytes(500)
+        compressed = compress_manifest(json_bytes)
+        with self.assertRaises(ValueError):
+            decompress_manifest(compressed[:-10])
+
+    def test_truncated_index(self):
+        _, json_bytes = self._manifest_bytes(500)
+        compressed = compress_manifest(json_bytes)
+        for cut in (5, 9, 12):
+            with self.assertRaises(ValueError):
+                decompress_manifest(compressed[:cut])
+
+    def test_bogus_frame_count(self):
+        data = FRAMED_MAGIC + (0xFFFFFFFF).to_bytes(4, 'little') + b"\x00" * 16
+        with self.assertRaises(ValueError):
+            decompress_manifest(data)
+
+
+class TestDecodePayload(unittest.TestCase):
+
+    def setUp(self):
+        self.raw = bytes(range(256)) * 700
+        self.encoded = base64.b64encode(self.raw).decode('ascii')
+
+    def test_plain(self):
+        self.assertEqual(decode_payload(self.encoded), self.raw)
+
+    def test_wrapped_lines(self):
+        wrapped = "\n".join(self.encoded[i:i + 76] for i in range(0, len(self.encoded), 76))
+        self.assertEqual(decode_payload(wrapped), self.raw)
+
+    def test_mixed_whitespace(self):
+        noisy = "  " + "\r\n\t ".join(
+            self.encoded[i:i + 61] for i in range(0, len(self.encoded), 61)
+        ) + "\n"
+        self.assertEqual(decode_payload(noisy), self.raw)
+
+    def test_stray_characters_fall_back(self):
+        self.assertEqual(decode_payload(self.encoded[:100] + "*" + self.encoded[100:]), self.raw)
+
+
+if __name__ == '__main__':
+    unittest.main()
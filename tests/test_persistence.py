@@ -0,0 +1,135 @@
+
+import unittest
+import importlib.util
+import sqlite3
+import tempfile
+import shutil
+import os
+
+# Load persistence.py on its own: importing the vibecode.chat package pulls in
+# the whole GUI, and other test modules replace it with a MagicMock
+_spec = importlib.util.spec_from_file_location(
+    "vibecode_chat_persistence",
+    os.path.join(os.path.dirname(__file__), '../src/vibecode/chat/persistence.py')
+)
+persistence = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(persistence)
+ContentDB = persistence.ContentDB
+
+
+class TestContentDBStats(unittest.TestCase):
+    """file_count / total_size are maintained by triggers (recursive_triggers=ON)."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "codebase.db")
+        self.db = ContentDB(self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def assertStats(self, count, size):
+        self.assertEqual(self.db.get_file_count(), count)
+        self.assertEqual(self.db.get_total_size(), size)
+
+    def test_empty(self):
+        self.assertStats(0, 0)
+
+    def test_insert(self):
+        self.db.upsert_file("a.py", "abc")
+        self.db.upsert_files([("b.py", "hello"), ("c.py", "")])
+        self.assertStats(3, 8)
+
+    def test_replace_counts_once(self):
+        self.db.upsert_file("a.py", "abc")
+        self.db.upsert_file("a.py", "abcdef")
+        self.db.upsert_files([("a.py", "x")])
+        self.assertStats(1, 1)
+
+    def test_delete(self):
+        self.db.upsert_files([("a.py", "abc"), ("b.py", "hello")])
+        self.db.delete_file("a.py")
+        self.assertStats(1, 5)
+        self.db.delete_file("missing.py")
+        self.assertStats(1, 5)
+
+    def test_delete_missing_files(self):
+        self.db.upsert_files([("a.py", "abc"), ("b.py", "hello"), ("c.py", "zz")])
+        self.db.delete_missing_files(["b.py"])
+        self.assertStats(1, 5)
+
+    def test_delete_missing_files_large_keep_list(self):
+        keep = [f"f{i}.py" for i in range(ContentDB._MAX_SQL_VARS + 10)]
+        self.db.upsert_files([(path, "x") for path in keep] + [("gone.py", "abcd")])
+        self.db.delete_missing_files(keep)
+        self.assertStats(len(keep), len(keep))
+
+    def test_clear(self):
+        self.db.upsert_files([("a.py", "abc"), ("b.py", "hello")])
+        self.db.clear()
+        self.assertStats(0, 0)
+
+    def test_stats_survive_reopen(self):
+        self.db.upsert_files([("a.py", "abc"), ("b.py", "hello")])
+        self.db.close()
+        self.db = ContentDB(self.db_path)
+        self.assertStats(2, 8)
+        self.db.upsert_file("a.py", "a")
+        self.assertStats(2, 6)
+
+
+class TestContentDBMigration(unittest.TestCase):
+    """Opening a schema v1 database adds the v2 columns and seeds the stats."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "codebase.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE file_cache (
+                file_path TEXT PRIMARY KEY,
+                file_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                file_size INTEGER,
+                line_count INTEGER,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT INTO metadata (key, value) VALUES ('schema_version', '1')")
+        conn.executemany(
+            "INSERT INTO file_cache (file_path, file_hash, content, file_size, line_count) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [("a.py", "oldhash", "abc", 3, 1), ("b.py", "oldhash", "hello\nworld", 11, 2)]
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_v1_database_is_upgraded(self):
+        with ContentDB(self.db_path) as db:
+            columns = {row[1] for row in db._conn().execute("PRAGMA table_info(file_cache)")}
+            self.assertTrue({'content_blob', 'encoding', 'mtime_ns'} <= columns)
+            version = db._conn().execute(
+                "SELECT value FROM metadata WHERE key='schema_version'"
+            ).fetchone()[0]
+            self.assertEqual(version, str(ContentDB.SCHEMA_VERSION))
+
+            # Legacy rows read back as plain text and are counted
+            self.assertEqual(db.get_content("b.py"), "hello\nworld")
+            self.assertEqual(db.get_file_count(), 2)
+            self.assertEqual(db.get_total_size(), 14)
+
+            # Legacy hashes never match, so the first sync rewrites the row
+            self.assertTrue(db.needs_update("a.py", "abc"))
+            db.upsert_file("a.py", "abc", mtime_ns=123)
+            self.assertFalse(db.needs_update("a.py", "abc", mtime_ns=123))
+            self.assertEqual(db.get_file_count(), 2)
+            self.assertEqual(db.get_total_size(), 14)
+
+
+if __name__ == '__main__':
+    unittest.main()